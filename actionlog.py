@@ -0,0 +1,140 @@
+"""
+Journal compact des actions d'une partie.
+
+Une action tient sur un octet : 4 bits de type, 4 bits d'argument
+(direction ou index de candidat). Avec la graine (cf. rng.GameRng), le
+journal suffit à rejouer la partie à l'identique (cf. replay.py) ; le hash
+de l'état final (GameState.state_hash) permet de vérifier le rejeu.
+
+Une partie reprise d'une sauvegarde ne repart pas de sa graine : le journal
+porte alors l'état de départ (octets de savegame.dumps), que le rejeu
+recharge avant de jouer les actions.
+
+Format binaire (to_bytes / from_bytes), entiers petit-boutistes :
+    "BPLG" | version u8 | capacité d'historique u32 | len(graine) u16 | graine utf-8
+    | len(départ) u32 + sauvegarde (0 : partie neuve de la graine)
+    | nombre d'actions u32 | actions (1 octet chacune) | drapeau u8 | hash final u64
+
+La version 1 (sans état de départ) est encore lue.
+"""
+
+import struct
+from typing import Iterator, Optional, Tuple
+
+MAGIC = b"BPLG"
+VERSION = 2
+
+# type d'action -> code (4 bits de poids fort)
+OPCODES = {"face": 0, "advance": 1, "choose": 2, "reroll": 3, "undo": 4, "redo": 5}
+KINDS = {code: kind for kind, code in OPCODES.items()}
+FACE_DIRS = ("up", "right", "down", "left")
+
+Action = Tuple
+
+
+def encode_action(action: Action) -> int:
+    kind = action[0]
+    code = OPCODES.get(kind)
+    if code is None:
+        raise ValueError(f"action inconnue : {action!r}")
+    arg = 0
+    if kind == "face":
+        arg = FACE_DIRS.index(action[1])
+    elif kind == "choose":
+        arg = action[1]
+        if not 0 <= arg < 16:
+            raise ValueError(f"index de candidat hors format : {arg}")
+    return code << 4 | arg
+
+
+def decode_action(byte: int) -> Action:
+    kind = KINDS.get(byte >> 4)
+    if kind is None:
+        raise ValueError(f"octet d'action invalide : {byte:#04x}")
+    if kind == "face":
+        return (kind, FACE_DIRS[byte & 0xF])
+    if kind == "choose":
+        return (kind, byte & 0xF)
+    return (kind,)
+
+
+class ActionLog:
+    """
+    Graine + actions jouées (+ hash de l'état final une fois la partie close).
+    history : capacité d'historique de la partie enregistrée (undo/redo rejoués).
+    start : sauvegarde de l'état de départ (None : partie neuve de la graine).
+    """
+
+    def __init__(self, seed, history: int = 0, start: Optional[bytes] = None):
+        self.seed = str(seed)
+        self.history = history
+        self.start = start
+        self.actions = bytearray()
+        self.final_hash: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def __iter__(self) -> Iterator[Action]:
+        return (decode_action(byte) for byte in self.actions)
+
+    def __getitem__(self, index: int) -> Action:
+        return decode_action(self.actions[index])
+
+    def append(self, action: Action) -> None:
+        self.actions.append(encode_action(action))
+
+    def close(self, state_hash: int) -> None:
+        """Note le hash de l'état final (vérifié au rejeu)."""
+        self.final_hash = state_hash
+
+    # ------------------ FORMAT BINAIRE ------------------
+
+    def to_bytes(self) -> bytes:
+        seed = self.seed.encode("utf-8")
+        return b"".join((
+            MAGIC,
+            struct.pack("<BIH", VERSION, self.history, len(seed)),
+            seed,
+            struct.pack("<I", len(self.start or b"")),
+            self.start or b"",
+            struct.pack("<I", len(self.actions)),
+            bytes(self.actions),
+            struct.pack("<BQ", self.final_hash is not None, self.final_hash or 0),
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ActionLog":
+        if data[:4] != MAGIC:
+            raise ValueError("pas un journal de partie")
+        version, history, seed_len = struct.unpack_from("<BIH", data, 4)
+        if version not in (1, VERSION):
+            raise ValueError(f"version de journal non gérée : {version}")
+        pos = 4 + struct.calcsize("<BIH")
+        seed = data[pos:pos + seed_len].decode("utf-8")
+        pos += seed_len
+        start = None
+        if version >= 2:
+            (start_len,) = struct.unpack_from("<I", data, pos)
+            pos += 4
+            if start_len:
+                start = bytes(data[pos:pos + start_len])
+            pos += start_len
+        (count,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        log = cls(seed, history, start)
+        log.actions = bytearray(data[pos:pos + count])
+        pos += count
+        has_hash, final_hash = struct.unpack_from("<BQ", data, pos)
+        if has_hash:
+            log.final_hash = final_hash
+        return log
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "ActionLog":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,361 @@
+"""
+Simulation vectorisée (NumPy) de K manoirs en parallèle.
+
+Les K parties sont empilées dans des tableaux : masques de portes et
+occupation par case (K, 45), salles posées, pioches (K, n_salles) et
+inventaires en colonnes (K, ressources). Chaque appel à step() fait avancer
+toutes les parties encore en cours d'un déplacement : choix de porte,
+verrou, tirage pondéré des 3 candidats, pose et entrée dans la pièce.
+
+Les règles sont celles de Manor._valid_rotations_for / draw_candidates et de
+engine.GameState (verrous, effets, loot), mais évaluées sur tout le lot à la
+fois ; les politiques sont intégrées ("greedy" ou "random").
+
+Exemple :
+    python batch_sim.py --games 20000 --policy greedy
+"""
+
+import argparse
+import sys
+from typing import Dict, Optional
+
+import numpy as np
+
+from board import NEIGHBORS
+from constants import GRID_COLS, N_CELLS
+from inventory.inventory import Inventory
+from manor import START_POS, GOAL_POS
+from rooms.catalogue import CATALOGUE
+from rooms.effects import ENTER, REGISTRY
+from rooms.loot import PERMANENTS, RESOURCES, LootTable
+
+# ==========================
+# Colonnes d'inventaire
+# ==========================
+
+# mêmes colonnes que rooms.loot : les gains de LootTable.sample s'ajoutent tels quels
+COLUMNS = RESOURCES
+COL: Dict[str, int] = {name: i for i, name in enumerate(COLUMNS)}
+PERMANENT_COLS = [COL[name] for name in COLUMNS if name in PERMANENTS]
+
+# effet -> ressource ajoutée, tiré du registre de rooms.effects
+EFFECT_COLUMNS = {name: kind.resource for name, kind in REGISTRY.items() if kind.resource is not None}
+RUNNING, WON, LOST = 0, 1, 2
+
+START_IDX = START_POS[0] * GRID_COLS + START_POS[1]
+GOAL_IDX = GOAL_POS[0] * GRID_COLS + GOAL_POS[1]
+SENTINEL = N_CELLS          # case fictive "occupée sans porte" hors de la grille
+
+
+class _Tables:
+    """Catalogue compilé en tableaux NumPy, indexé comme CATALOGUE."""
+
+    def __init__(self, catalogue):
+        n = len(catalogue)
+        self.n_rooms = n
+
+        # voisins (case fictive SENTINEL hors grille)
+        self.neigh = np.array(
+            [[SENTINEL if nb < 0 else nb for nb in row] for row in NEIGHBORS], dtype=np.int64
+        )
+
+        # rotations distinctes : (n, 4), -1 pour les rotations en double
+        self.rot_masks = np.full((n, 4), -1, dtype=np.int64)
+        for i, rd in enumerate(catalogue):
+            for slot, (_orientation, mask) in enumerate(rd.rotations):
+                self.rot_masks[i, slot] = mask
+        self.rot_ok = self.rot_masks >= 0
+
+        # cul-de-sac interdit sauf salle objectif (cf. Manor._rotations_matching)
+        self.door_ok = np.array([rd.door_count > 1 or rd.dead_end_ok for rd in catalogue])
+        # cases autorisées (bitboard 45 bits) par côté d'entrée, cf. rooms.placement
+        self.allowed = np.array([rd.allowed_cells for rd in catalogue], dtype=np.int64)
+        self.cost = np.array([rd.gem_cost for rd in catalogue], dtype=np.int64)
+        self.weight = np.array([float(rd.weight) for rd in catalogue])
+
+        # pioche initiale : tout sauf les salles fixes
+        names = [rd.name for rd in catalogue]
+        self.entrance = names.index("Entrance Hall")
+        self.antechamber = names.index("Antechamber")
+        self.in_deck = np.ones(n, dtype=bool)
+        self.in_deck[[self.entrance, self.antechamber]] = False
+        self.base_mask = np.array([rd.door_mask for rd in catalogue], dtype=np.int64)
+
+        # effets d'entrée : colonne (-1 = aucun) et bornes
+        # (seuls les effets déclenchés à chaque entrée sont simulés en lot)
+        self.effect_col = np.full(n, -1, dtype=np.int64)
+        self.effect_lo = np.zeros(n, dtype=np.int64)
+        self.effect_hi = np.zeros(n, dtype=np.int64)
+        for i, rd in enumerate(catalogue):
+            effect = rd.effect
+            if effect is None or effect.trigger != ENTER:
+                continue
+            column = EFFECT_COLUMNS.get(effect.name)
+            if column is None:
+                continue
+            self.effect_col[i] = COL[column]
+            if effect.amount is None:
+                self.effect_lo[i] = self.effect_hi[i] = 1
+            else:
+                self.effect_lo[i], self.effect_hi[i] = effect.amount
+
+        # loot : tables compilées, tirées en une fois pour tout le lot
+        self.loot = LootTable(catalogue)
+
+
+TABLES = _Tables(CATALOGUE)
+
+
+class BatchManors:
+    """K parties avancées en parallèle, un déplacement par step()."""
+
+    def __init__(self, k: int, seed: Optional[int] = None, policy: str = "greedy"):
+        if policy not in ("greedy", "random"):
+            raise ValueError(f"politique inconnue : {policy!r}")
+        t = TABLES
+        self.k = k
+        self.policy = policy
+        self.rng = np.random.default_rng(seed)
+
+        self.doors = np.zeros((k, N_CELLS + 1), dtype=np.int64)
+        self.occupied = np.zeros((k, N_CELLS + 1), dtype=bool)
+        self.occupied[:, SENTINEL] = True
+        self.room_at = np.full((k, N_CELLS), -1, dtype=np.int64)
+        self.looted = np.zeros((k, N_CELLS), dtype=bool)
+        self.live = np.tile(t.in_deck, (k, 1))
+
+        inv = Inventory()
+        self.inv = np.tile(np.array([int(getattr(inv, name)) for name in COLUMNS], dtype=np.int64), (k, 1))
+        self.pos = np.full(k, START_IDX, dtype=np.int64)
+        self.status = np.full(k, RUNNING, dtype=np.int8)
+        self.moves = np.zeros(k, dtype=np.int64)
+
+        for cell, room in ((START_IDX, t.entrance), (GOAL_IDX, t.antechamber)):
+            self.doors[:, cell] = t.base_mask[room]
+            self.occupied[:, cell] = True
+            self.room_at[:, cell] = room
+
+    # ------------------ BOUCLE ------------------
+
+    def run(self, max_steps: int = 2000) -> "BatchManors":
+        for _ in range(max_steps):
+            if not self.step():
+                break
+        return self
+
+    def step(self) -> int:
+        """Un déplacement pour chaque partie en cours. Renvoie le nombre de parties actives."""
+        rows = np.flatnonzero(self.status == RUNNING)
+        if rows.size == 0:
+            return 0
+        self.moves[rows] += 1
+
+        here = self.pos[rows]
+        dirs = self._choose_dirs(rows, here)
+        target = TABLES.neigh[here, dirs]
+        # aucune porte utilisable (ne devrait pas arriver) : partie bloquée
+        stuck = target == SENTINEL
+        if stuck.any():
+            self.status[rows[stuck]] = LOST
+            rows, target, dirs = rows[~stuck], target[~stuck], dirs[~stuck]
+
+        existing = self.occupied[rows, target]
+        if existing.any():
+            self._enter(rows[existing], target[existing])
+        new = ~existing
+        if new.any():
+            self._open_new(rows[new], target[new], (dirs[new] + 2) % 4)
+        return rows.size
+
+    # ------------------ POLITIQUE ------------------
+
+    def _choose_dirs(self, rows, here):
+        """Porte ouverte de la pièce courante, tirée selon la politique."""
+        open_doors = ((self.doors[rows, here][:, None] >> np.arange(4)) & 1).astype(bool)
+        open_doors &= TABLES.neigh[here] != SENTINEL
+        weights = np.ones((rows.size, 4))
+        if self.policy == "greedy":
+            weights[:, 0] = 4.0
+            col = here % GRID_COLS
+            weights[col < GOAL_POS[1], 1] = 2.0
+            weights[col > GOAL_POS[1], 3] = 2.0
+        # course d'exponentielles : argmin(E / w) suit les poids w
+        keys = self.rng.exponential(size=(rows.size, 4)) / weights
+        keys[~open_doors] = np.inf
+        return keys.argmin(axis=1)
+
+    def _choose_candidate(self, cands, affordable):
+        if self.policy == "greedy":
+            costs = np.where(affordable, TABLES.cost[np.maximum(cands, 0)], np.iinfo(np.int64).max)
+            return costs.argmin(axis=1)
+        keys = np.where(affordable, self.rng.random(cands.shape), -1.0)
+        return keys.argmax(axis=1)
+
+    # ------------------ RÈGLES ------------------
+
+    def _constraints(self, rows, target):
+        """(known, required) de chaque case visée, cf. Board.constraints."""
+        known = np.zeros(rows.size, dtype=np.int64)
+        required = np.zeros(rows.size, dtype=np.int64)
+        for d in range(4):
+            nb = TABLES.neigh[target, d]
+            occ = self.occupied[rows, nb]
+            known |= occ.astype(np.int64) << d
+            facing = ((self.doors[rows, nb] >> ((d + 2) % 4)) & 1).astype(bool) & occ
+            required |= facing.astype(np.int64) << d
+        return known, required
+
+    def _valid(self, rows, target, entry):
+        """
+        Salles posables sur chaque case visée, entrée par le côté entry :
+        (valid (P, n), valid_rot (P, n, 4)).
+        Rotations + règle de placement + pioche, cf. Manor._valid_buckets.
+        """
+        t = TABLES
+        known, required = self._constraints(rows, target)
+        valid_rot = t.rot_ok[None] & ((t.rot_masks[None] & known[:, None, None]) == required[:, None, None])
+        place_ok = ((t.allowed[:, entry].T >> target[:, None]) & 1).astype(bool)
+        valid = valid_rot.any(axis=2) & t.door_ok[None] & place_ok & self.live[rows]
+        return valid, valid_rot
+
+    def _open_new(self, rows, target, entry):
+        t = TABLES
+        inv = self.inv
+
+        # verrou (cf. Manor.lock_level_for_row / Inventory.can_open)
+        row_of = target // GRID_COLS
+        lock = self.rng.choice(np.array([0, 1, 1, 1, 2]), size=rows.size)
+        lock[row_of == START_POS[0]] = 0
+        lock[row_of == GOAL_POS[0]] = 2
+        keys = inv[rows, COL["keys"]]
+        can = (lock == 0) | ((lock == 1) & ((keys >= 1) | (inv[rows, COL["lockpick"]] > 0))) | ((lock == 2) & (keys >= 2))
+        rows, target, entry, lock, keys = rows[can], target[can], entry[can], lock[can], keys[can]
+        spend = np.where(lock == 2, 2, np.where((lock == 1) & (keys >= 1), 1, 0))
+        inv[rows, COL["keys"]] -= spend
+        if rows.size == 0:
+            return
+
+        valid, valid_rot = self._valid(rows, target, entry)
+        has_any = valid.any(axis=1)
+        sub = np.flatnonzero(has_any)
+        chosen = np.full(rows.size, -1, dtype=np.int64)
+
+        # tirage, relance avec un dé si rien n'est abordable
+        pending = sub
+        while pending.size:
+            cands = self._sample_candidates(valid[pending])
+            real = cands >= 0
+            gems = inv[rows[pending], COL["gems"]][:, None]
+            affordable = real & (t.cost[np.maximum(cands, 0)] <= gems)
+            got = affordable.any(axis=1)
+            pick = self._choose_candidate(cands, affordable)
+            chosen[pending[got]] = cands[np.flatnonzero(got), pick[got]]
+
+            left = pending[~got]
+            can_roll = inv[rows[left], COL["dice"]] > 0
+            inv[rows[left[can_roll]], COL["dice"]] -= 1
+            # tirage ouvert sans choix possible : partie bloquée
+            self.status[rows[left[~can_roll]]] = LOST
+            pending = left[can_roll]
+
+        placed = np.flatnonzero(chosen >= 0)
+        if placed.size:
+            self._place(rows[placed], target[placed], chosen[placed], valid_rot[placed, chosen[placed]])
+
+    def _sample_candidates(self, valid):
+        """3 tirages pondérés par rareté (avec remise) par ligne, cf. draw_candidates."""
+        t = TABLES
+        rng = self.rng
+        p = valid.shape[0]
+
+        weights = valid * t.weight[None]
+        cum = np.cumsum(weights, axis=1)
+        u = rng.random((p, 3)) * cum[:, -1:]
+        drawn = np.minimum((cum[:, None, :] <= u[:, :, None]).sum(axis=2), t.n_rooms - 1)
+
+        # 3 salles valides ou moins : on les prend toutes
+        n_valid = valid.sum(axis=1)
+        first = np.argsort(~valid, axis=1, kind="stable")[:, :3]
+        first = np.where(np.arange(3)[None] < n_valid[:, None], first, -1)
+        cands = np.where((n_valid <= 3)[:, None], first, drawn)
+
+        # garantir au moins 1 salle coût 0
+        real = cands >= 0
+        paid = (~real | (t.cost[np.maximum(cands, 0)] > 0)).all(axis=1)
+        free_valid = valid & (t.cost == 0)[None]
+        need = np.flatnonzero(paid & free_valid.any(axis=1))
+        if need.size:
+            free_pick = np.where(free_valid[need], rng.random((need.size, t.n_rooms)), -1.0).argmax(axis=1)
+            slot = (rng.random(need.size) * real[need].sum(axis=1)).astype(np.int64)
+            cands[need, slot] = free_pick
+        return cands
+
+    def _place(self, rows, target, rooms, valid_rot):
+        t = TABLES
+        # rotation légale au hasard
+        slot = np.where(valid_rot, self.rng.random(valid_rot.shape), -1.0).argmax(axis=1)
+        self.doors[rows, target] = t.rot_masks[rooms, slot]
+        self.occupied[rows, target] = True
+        self.room_at[rows, target] = rooms
+        self.live[rows, rooms] = False
+        self.inv[rows, COL["gems"]] -= t.cost[rooms]
+        self._enter(rows, target)
+
+    def _enter(self, rows, target):
+        t = TABLES
+        inv = self.inv
+        self.pos[rows] = target
+        inv[rows, COL["steps"]] -= 1
+        rooms = self.room_at[rows, target]
+
+        # effet d'entrée
+        col = t.effect_col[rooms]
+        has = col >= 0
+        if has.any():
+            values = self.rng.integers(t.effect_lo[rooms[has]], t.effect_hi[rooms[has]] + 1)
+            np.add.at(inv, (rows[has], col[has]), values)
+
+        # loot, une seule fois par pièce
+        fresh = ~self.looted[rows, target]
+        if fresh.any():
+            r2 = rows[fresh]
+            # une seule partie par ligne : pas de doublon dans r2
+            inv[r2] += t.loot.sample(rooms[fresh], self.rng)
+            self.looted[r2, target[fresh]] = True
+        inv[np.ix_(rows, PERMANENT_COLS)] = np.minimum(inv[np.ix_(rows, PERMANENT_COLS)], 1)
+
+        # fin de partie (défaite d'abord, cf. GameState.post_move_check)
+        lost = inv[rows, COL["steps"]] <= 0
+        self.status[rows[lost]] = LOST
+        self.status[rows[~lost & (target == GOAL_IDX)]] = WON
+
+    # ------------------ RÉSULTATS ------------------
+
+    def summary(self) -> Dict[str, float]:
+        done = self.status != RUNNING
+        return {
+            "games": self.k,
+            "finished": int(done.sum()),
+            "win_rate": float((self.status == WON).mean()),
+            "steps_left": float(self.inv[:, COL["steps"]].mean()),
+            "rooms_placed": float(self.occupied[:, :N_CELLS].sum(axis=1).mean()),
+            "moves": float(self.moves.mean()),
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulation vectorisée de K manoirs.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=("greedy", "random"), default="greedy")
+    parser.add_argument("--max-steps", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    batch = BatchManors(args.games, seed=args.seed, policy=args.policy).run(args.max_steps)
+    for key, value in batch.summary().items():
+        print(f"{key} : {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
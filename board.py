@@ -0,0 +1,202 @@
+"""
+Plateau compact du manoir.
+
+Les 9x5 cases sont stockées à plat (index = r * GRID_COLS + c) :
+- rooms : la Room posée (ou None) pour chaque case
+- occupied : bitboard (int Python) des cases occupées
+- door_bb[d] : bitboard des cases ayant une porte dans la direction d
+
+Les tables de voisins et de bordure sont précalculées une fois au chargement.
+
+Clonage en copie sur écriture : un clone partage les tableaux de l'original
+jusqu'à la première écriture de l'un des deux, et ne copie une Room que
+lorsqu'elle doit être modifiée (cf. mutable_room).
+"""
+
+import copy
+from typing import Iterator, List, Optional, Tuple
+
+from constants import GRID_ROWS, GRID_COLS, N_CELLS, DOOR_OFFSETS
+
+# ------------------ TABLES PRÉCALCULÉES ------------------
+
+FULL_MASK = (1 << N_CELLS) - 1
+
+
+def cell_index(r: int, c: int) -> int:
+    return r * GRID_COLS + c
+
+
+def cell_coords(idx: int) -> Tuple[int, int]:
+    return divmod(idx, GRID_COLS)
+
+
+def _build_tables():
+    neighbors = []
+    edge_doors = []
+    border = 0
+    for idx in range(N_CELLS):
+        r, c = cell_coords(idx)
+        row_neighbors = []
+        edges = 0
+        for d, (dr, dc) in enumerate(DOOR_OFFSETS):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < GRID_ROWS and 0 <= nc < GRID_COLS:
+                row_neighbors.append(cell_index(nr, nc))
+            else:
+                row_neighbors.append(-1)
+                edges |= 1 << d
+        neighbors.append(tuple(row_neighbors))
+        edge_doors.append(edges)
+        if edges:
+            border |= 1 << idx
+    return tuple(neighbors), tuple(edge_doors), border
+
+
+# NEIGHBORS[idx][d] : index du voisin dans la direction d (-1 hors grille)
+# EDGE_DOORS[idx] : masque 4 bits des côtés de la case qui donnent sur l'extérieur
+# BORDER_MASK : bitboard des cases de l'anneau extérieur
+NEIGHBORS, EDGE_DOORS, BORDER_MASK = _build_tables()
+
+
+class Board:
+    """Grille 9x5 à plat + bitboards, clonable en O(1) (copie sur écriture)."""
+
+    __slots__ = ("rooms", "occupied", "door_bb", "_shared", "_owned")
+
+    def __init__(self):
+        self.rooms: List[Optional[object]] = [None] * N_CELLS
+        self.occupied = 0
+        self.door_bb = [0, 0, 0, 0]
+        # tableaux partagés avec un clone / bitboard des Room propres à ce plateau
+        self._shared = False
+        self._owned = 0
+
+    # ------------------ ACCÈS ------------------
+
+    def get(self, idx: int):
+        return self.rooms[idx]
+
+    def set(self, idx: int, room) -> None:
+        """
+        Pose (ou retire si room est None) la pièce de la case idx.
+        La Room passée appartient désormais à ce plateau.
+        """
+        self._detach()
+        if self.rooms[idx] is not None:
+            self._clear_bits(idx)
+        self.rooms[idx] = room
+        bit = 1 << idx
+        if room is None:
+            self._owned &= ~bit
+            return
+
+        self._owned |= bit
+        mask = room.placed_doors
+        self.occupied |= bit
+        for d in range(4):
+            if mask & (1 << d):
+                self.door_bb[d] |= bit
+
+    def mutable_room(self, idx: int):
+        """La Room de la case idx, copiée d'abord si elle est partagée avec un clone."""
+        room = self.rooms[idx]
+        if room is None or self._owned >> idx & 1:
+            return room
+        self._detach()
+        room = copy.copy(room)
+        self.rooms[idx] = room
+        self._owned |= 1 << idx
+        return room
+
+    def disown(self) -> None:
+        """Plus aucune Room n'est exclusive : toute modification passera par une copie."""
+        self._owned = 0
+
+    def _detach(self) -> None:
+        """Copie les tableaux partagés avant la première écriture."""
+        if self._shared:
+            self.rooms = list(self.rooms)
+            self._shared = False
+
+    def _clear_bits(self, idx: int) -> None:
+        keep = ~(1 << idx)
+        self.occupied &= keep
+        for d in range(4):
+            self.door_bb[d] &= keep
+
+    # ------------------ RÈGLES ------------------
+
+    def constraints(self, idx: int) -> Tuple[int, int]:
+        """
+        (known, required) pour la case idx :
+        - known : côtés déjà décidés (bord du manoir ou voisin posé)
+        - required : parmi ces côtés, ceux qui doivent avoir une porte
+        """
+        known = EDGE_DOORS[idx]
+        required = 0
+        occupied = self.occupied
+        for d, n in enumerate(NEIGHBORS[idx]):
+            if n < 0 or not occupied >> n & 1:
+                continue
+            known |= 1 << d
+            if self.door_bb[(d + 2) % 4] >> n & 1:
+                required |= 1 << d
+        return known, required
+
+    # ------------------ CLONAGE ------------------
+
+    def clone(self) -> "Board":
+        """Clone en O(1) : tableaux et Room partagés jusqu'à la première écriture."""
+        other = Board.__new__(Board)
+        other.rooms = self.rooms
+        other.occupied = self.occupied
+        other.door_bb = list(self.door_bb)
+        # les deux plateaux copieront avant d'écrire ; aucune Room n'est plus exclusive
+        other._shared = self._shared = True
+        other._owned = self._owned = 0
+        return other
+
+
+# ------------------ VUE grid[r][c] ------------------
+
+class _RowView:
+    __slots__ = ("_board", "_base")
+
+    def __init__(self, board: Board, r: int):
+        self._board = board
+        self._base = r * GRID_COLS
+
+    def __len__(self) -> int:
+        return GRID_COLS
+
+    def __getitem__(self, c: int):
+        if not 0 <= c < GRID_COLS:
+            raise IndexError(c)
+        return self._board.rooms[self._base + c]
+
+    def __setitem__(self, c: int, room) -> None:
+        if not 0 <= c < GRID_COLS:
+            raise IndexError(c)
+        self._board.set(self._base + c, room)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._board.rooms[self._base:self._base + GRID_COLS])
+
+
+class GridView:
+    """Vue grid[r][c] (lecture/écriture) au-dessus d'un Board à plat."""
+
+    __slots__ = ("_rows",)
+
+    def __init__(self, board: Board):
+        self._rows = tuple(_RowView(board, r) for r in range(GRID_ROWS))
+
+    def __len__(self) -> int:
+        return GRID_ROWS
+
+    def __getitem__(self, r: int) -> _RowView:
+        return self._rows[r]
+
+    def __iter__(self) -> Iterator[_RowView]:
+        return iter(self._rows)
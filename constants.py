@@ -0,0 +1,9 @@
+from typing import Tuple
+
+# ------------------ GRILLE ------------------
+GRID_ROWS = 9      # 9 lignes
+GRID_COLS = 5      # 5 colonnes
+N_CELLS = GRID_ROWS * GRID_COLS
+
+# décalage (dr, dc) vers le voisin, indexé comme les portes (0=up,1=right,2=down,3=left)
+DOOR_OFFSETS: Tuple[Tuple[int, int], ...] = ((-1, 0), (0, 1), (1, 0), (0, -1))
@@ -0,0 +1,276 @@
+"""
+Pioche indexée utilisée par Manor.draw_candidates.
+
+Les salles de la pioche sont rangées dans des seaux qui partagent la même clé
+(forme de portes, cases autorisées, coût nul ou non). Toutes les salles
+d'un seau ont exactement les mêmes rotations et la même règle de placement :
+un seul test par seau suffit pour l'accepter ou le rejeter sur une case.
+
+Chaque seau porte un arbre de Fenwick des poids de rareté (et un second pour
+les effectifs) : tirage pondéré et retrait en O(log n), tirage restreint
+aux seaux valides pour la case visée.
+
+Deck.clone partage tout avec l'original : le drapeau de présence et les
+arbres d'un seau ne sont copiés qu'au premier retrait qui les touche.
+"""
+
+from random import Random
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from rooms.catalogue import CompiledRoom
+
+# (door_mask, cul-de-sac autorisé), cases autorisées par côté d'entrée, coût nul
+BucketKey = Tuple[Tuple[int, bool], Tuple[int, int, int, int], bool]
+
+
+def shape_key(rd: CompiledRoom) -> Tuple[int, bool]:
+    """Forme de portes : masque de base + exception cul-de-sac (salle objectif)."""
+    return rd.door_mask, rd.dead_end_ok
+
+
+def bucket_key(rd: CompiledRoom) -> BucketKey:
+    return shape_key(rd), rd.allowed_cells, rd.free
+
+
+# ------------------ ARBRE DE FENWICK ------------------
+
+class FenwickTree:
+    """Sommes préfixes sur des poids entiers : mise à jour et recherche en O(log n)."""
+
+    __slots__ = ("_tree", "_values", "_total", "_top")
+
+    def __init__(self, values: Sequence[int]):
+        n = len(values)
+        tree = [0] * (n + 1)
+        for i, value in enumerate(values, 1):
+            tree[i] += value
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._values = list(values)
+        self._total = sum(values)
+        self._top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def copy(self) -> "FenwickTree":
+        other = FenwickTree.__new__(FenwickTree)
+        other._tree = list(self._tree)
+        other._values = list(self._values)
+        other._total = self._total
+        other._top = self._top
+        return other
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def get(self, i: int) -> int:
+        return self._values[i]
+
+    def set(self, i: int, value: int) -> None:
+        delta = value - self._values[i]
+        if not delta:
+            return
+        self._values[i] = value
+        self._total += delta
+        n = len(self._values)
+        i += 1
+        while i <= n:
+            self._tree[i] += delta
+            i += i & -i
+
+    def find(self, target: int) -> int:
+        """Plus petit index i tel que poids[0..i] > target (0 <= target < total)."""
+        tree = self._tree
+        n = len(self._values)
+        pos = 0
+        step = self._top
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+# ------------------ PIOCHE ------------------
+
+class DeckBucket:
+    """Salles d'une même clé : poids de rareté et effectifs en arbres de Fenwick."""
+
+    __slots__ = ("key", "index", "slots", "weights", "counts")
+
+    def __init__(self, key: BucketKey, index: int, slots: List[int], weights: List[int],
+                 counts: Optional[List[int]] = None):
+        self.key = key
+        self.index = index
+        self.slots = slots
+        self.weights = FenwickTree(weights)
+        self.counts = FenwickTree(counts if counts is not None else [1] * len(slots))
+
+    def copy(self) -> "DeckBucket":
+        """Copie des arbres ; clé et slots (immuables) sont partagés."""
+        other = DeckBucket.__new__(DeckBucket)
+        other.key = self.key
+        other.index = self.index
+        other.slots = self.slots
+        other.weights = self.weights.copy()
+        other.counts = self.counts.copy()
+        return other
+
+    @property
+    def count(self) -> int:
+        return self.counts.total
+
+    @property
+    def weight(self) -> int:
+        return self.weights.total
+
+    @property
+    def free(self) -> bool:
+        return self.key[2]
+
+
+class Deck:
+    """
+    Pioche : salles restantes, dans l'ordre (mélangé) de construction.
+    Chaque salle occupe un slot fixe ; retirer une salle met son poids à 0.
+    """
+
+    def __init__(self, rooms: Iterable[CompiledRoom] = (), live: Optional[Sequence[int]] = None):
+        """live : présence de chaque salle (chargement d'une pioche entamée), toutes par défaut."""
+        self.rooms: List[CompiledRoom] = list(rooms)
+        self.live = bytearray(live) if live is not None else bytearray(b"\x01" * len(self.rooms))
+        self._size = sum(self.live)
+        # index de catalogue -> slot
+        self._slot_of: Dict[int, int] = {rd.index: i for i, rd in enumerate(self.rooms)}
+
+        grouped: Dict[BucketKey, List[int]] = {}
+        for slot, rd in enumerate(self.rooms):
+            grouped.setdefault(bucket_key(rd), []).append(slot)
+
+        # slot -> (index du seau, position dans le seau), poids de rareté de chaque slot
+        self._buckets: List[DeckBucket] = []
+        self._where: List[Tuple[int, int]] = [None] * len(self.rooms)
+        self._weight_of: List[int] = [rd.weight for rd in self.rooms]
+        for key, slots in grouped.items():
+            weights = [self._weight_of[slot] if self.live[slot] else 0 for slot in slots]
+            bucket = DeckBucket(key, len(self._buckets), slots, weights, [self.live[slot] for slot in slots])
+            self._buckets.append(bucket)
+            for pos, slot in enumerate(slots):
+                self._where[slot] = (bucket.index, pos)
+
+        # copie sur écriture : ce qui appartient en propre à cette pioche
+        self._live_owned = True
+        self._owned = [True] * len(self._buckets)
+
+    def clone(self) -> "Deck":
+        """Clone en O(nombre de seaux) ; les arbres sont copiés au premier retrait."""
+        other = Deck.__new__(Deck)
+        other.rooms = self.rooms
+        other.live = self.live
+        other._size = self._size
+        other._slot_of = self._slot_of
+        other._where = self._where
+        other._weight_of = self._weight_of
+        other._buckets = list(self._buckets)
+        other._live_owned = self._live_owned = False
+        other._owned = [False] * len(self._buckets)
+        self._owned = [False] * len(self._buckets)
+        return other
+
+    # ------------------ ACCÈS ------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[CompiledRoom]:
+        for slot, rd in enumerate(self.rooms):
+            if self.live[slot]:
+                yield rd
+
+    def __contains__(self, rd: CompiledRoom) -> bool:
+        slot = self._slot_of.get(rd.index)
+        return slot is not None and bool(self.live[slot])
+
+    def bucket(self, index: int) -> DeckBucket:
+        return self._buckets[index]
+
+    def buckets(self) -> Iterator[DeckBucket]:
+        """Seaux non vides."""
+        for bucket in self._buckets:
+            if bucket.count:
+                yield bucket
+
+    def bucket_of(self, rd: CompiledRoom) -> Optional[DeckBucket]:
+        """Seau de rd s'il est encore dans la pioche."""
+        slot = self._slot_of.get(rd.index)
+        if slot is None or not self.live[slot]:
+            return None
+        return self._buckets[self._where[slot][0]]
+
+    def rooms_in(self, bucket: DeckBucket) -> List[CompiledRoom]:
+        return [self.rooms[slot] for slot in bucket.slots if self.live[slot]]
+
+    # ------------------ RETRAIT / REMISE ------------------
+
+    def remove(self, rd: CompiledRoom) -> bool:
+        """Retire rd (par index de catalogue) en O(log n). Renvoie False s'il n'y était pas."""
+        slot = self._slot_of.get(rd.index)
+        if slot is None or not self.live[slot]:
+            return False
+        self._set_live(slot, False)
+        return True
+
+    def put_back(self, rd: CompiledRoom) -> bool:
+        """
+        Remet rd dans la pioche (annulation d'un retrait), avec son poids
+        d'origine. Renvoie False si rd n'est pas de cette pioche ou y est déjà.
+        """
+        slot = self._slot_of.get(rd.index)
+        if slot is None or self.live[slot]:
+            return False
+        self._set_live(slot, True)
+        return True
+
+    def _set_live(self, slot: int, live: bool) -> None:
+        if not self._live_owned:
+            self.live = bytearray(self.live)
+            self._live_owned = True
+        self.live[slot] = live
+        self._size += 1 if live else -1
+        index, pos = self._where[slot]
+        bucket = self._buckets[index]
+        if not self._owned[index]:
+            bucket = self._buckets[index] = bucket.copy()
+            self._owned[index] = True
+        bucket.weights.set(pos, self._weight_of[slot] if live else 0)
+        bucket.counts.set(pos, 1 if live else 0)
+
+    # ------------------ TIRAGES ------------------
+
+    def sample(self, buckets: Sequence[DeckBucket], k: int, rng: Random) -> List[CompiledRoom]:
+        """k tirages pondérés par rareté (avec remise) parmi les seaux donnés."""
+        total = sum(b.weight for b in buckets)
+        if total <= 0:
+            return []
+        return [self._pick(buckets, rng.randrange(total), by_count=False) for _ in range(k)]
+
+    def pick_uniform(self, buckets: Sequence[DeckBucket], rng: Random) -> Optional[CompiledRoom]:
+        """Une salle choisie uniformément parmi les seaux donnés."""
+        total = sum(b.count for b in buckets)
+        if total <= 0:
+            return None
+        return self._pick(buckets, rng.randrange(total), by_count=True)
+
+    def _pick(self, buckets: Sequence[DeckBucket], target: int, by_count: bool) -> CompiledRoom:
+        for bucket in buckets:
+            tree = bucket.counts if by_count else bucket.weights
+            if target < tree.total:
+                return self.rooms[bucket.slots[tree.find(target)]]
+            target -= tree.total
+        raise ValueError("target hors des poids de la pioche")
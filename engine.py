@@ -0,0 +1,506 @@
+"""
+Moteur de jeu sans pygame.
+
+GameState exécute les actions du joueur (face, advance, choose_candidate,
+reroll) et applique toutes les règles : verrous, tirage, effets de pièces,
+loot, victoire/défaite. main_game.Game n'est plus qu'une coquille
+entrées/affichage au-dessus de ce moteur, qui peut aussi tourner seul
+(tests, simulations en lot).
+
+Avec un historique (GameState(history=capacité)), chaque action du joueur
+laisse un history.Delta et peut être annulée / rétablie (undo / redo).
+
+Tout l'aléa passe par les flux de GameState.rng (cf. rng.GameRng) : une
+même graine et les mêmes actions redonnent exactement la même partie.
+GameState(record=True) note ces actions dans un actionlog.ActionLog
+(rejouable par replay.py).
+"""
+
+import functools
+from random import Random
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Tuple
+
+from actionlog import ActionLog
+from history import Delta, History
+from inventory.inventory import Inventory
+from manor import Manor, Candidate, DIRECTIONS, DOOR_INDEX, inside
+from player import Player
+from rng import GameRng, Seed
+from rooms.catalogue import PASSIVE_ROOMS, CompiledRoom
+from rooms.effects import DRAFT, ENTER, FIRST, PASSIVE
+from rooms.loot import PERMANENTS, roll
+import zobrist
+
+
+def get_room_def(room_obj):
+    """Compat : Room wrapper ou CompiledRoom direct."""
+    if hasattr(room_obj, "definition"):
+        return room_obj.definition
+    return room_obj
+
+
+# ==========================
+# Effets de pièces
+# ==========================
+
+def apply_room_effect(inv: Inventory, rd: CompiledRoom, rng: Random, trigger: str = ENTER) -> Optional[str]:
+    """Déclenche l'effet compilé de rd s'il répond à trigger (cf. rooms.effects)."""
+    effect = rd.effect
+    if effect is None or effect.trigger != trigger:
+        return None
+    return effect.fire(inv, rng)
+
+# ==========================
+# room_loot function
+#=========================
+
+# message par ressource trouvée (cf. rooms.loot.RESOURCES)
+LOOT_MESSAGES = {
+    "steps": "+{n} pas (nourriture)",
+    "coins": "+{n} pièce(s)",
+    "gems": "+{n} gemme(s)",
+    "keys": "+{n} clé(s)",
+    "dice": "+{n} dé(s)",
+    "lockpick": "Kit de crochetage obtenu",
+    "metal_detector": "Détecteur de métal obtenu",
+    "rabbit_foot": "Patte de lapin obtenue",
+    "shovel": "Pelle obtenue",
+}
+
+
+def loot_room(inv: Inventory, room, rng: Random):
+    """
+    Fouille la pièce à la première visite : table de loot compilée (cf.
+    rooms.loot), tout le butin ajouté d'un seul Inventory.apply.
+    """
+    if room.looted:
+        return []
+
+    messages = []
+    found = {}
+    for item, count in roll(room.definition.loot, rng):
+        resource = item.resource_name
+        n = 1 if resource in PERMANENTS else count * item.scale
+        found[resource] = found.get(resource, 0) + n
+        messages.append(LOOT_MESSAGES[resource].format(n=n))
+    if found:
+        inv.apply(found)
+
+    room.looted = True
+    return messages
+
+
+# ==========================
+# Tirage en cours
+# ==========================
+
+@dataclass
+class Draft:
+    """
+    Tirage ouvert sur une case :
+    - pos : (row, col) de la case visée
+    - from_dir : direction du déplacement depuis la pièce courante
+    - candidates : Candidate tirés (avec leurs rotations légales)
+    - orientations / doors_list : rotation retenue pour chaque candidat
+    """
+    pos: Tuple[int, int]
+    from_dir: str
+    candidates: List[Candidate]
+    orientations: List[int] = field(default_factory=list)
+    doors_list: List[int] = field(default_factory=list)
+
+    def copy(self) -> "Draft":
+        return replace(
+            self,
+            candidates=list(self.candidates),
+            orientations=list(self.orientations),
+            doors_list=list(self.doors_list),
+        )
+
+    def roll_orientations(self, rng: Random) -> None:
+        """Choisit une orientation/portes parmi les rotations légales de chaque candidat."""
+        self.orientations = []
+        self.doors_list = []
+
+        for cand in self.candidates:
+            if cand.options:
+                orientation, doors = rng.choice(cand.options)
+            else:
+                orientation, doors = 0, cand.room.door_mask
+            self.orientations.append(orientation)
+            self.doors_list.append(doors)
+
+
+# ==========================
+# État de partie
+# ==========================
+
+def _recorded(kind: str):
+    """
+    Action du joueur de type kind (cf. apply) : notée au journal s'il y en a
+    un, et son Delta ajouté à l'historique s'il y en a un.
+    """
+    def decorate(action):
+        @functools.wraps(action)
+        def wrapper(self, *args):
+            if self.log is not None:
+                self.log.append((kind,) + args)
+            if self.history is None:
+                return action(self, *args)
+            before = self._capture()
+            result = action(self, *args)
+            self._record(before)
+            return result
+        return wrapper
+    return decorate
+
+
+class GameState:
+    """Partie complète (manoir, inventaire, joueur) pilotée par actions."""
+
+    def __init__(self, seed: Optional[Seed] = None, history: Optional[int] = None,
+                 record: bool = False):
+        # seed : graine de tous les flux aléatoires (None = au hasard)
+        # history : nombre d'actions annulables (None = pas d'historique)
+        # record : noter les actions jouées dans self.log
+        self.rng = GameRng(seed)
+        self.history: Optional[History] = History(history) if history else None
+        self.log: Optional[ActionLog] = ActionLog(self.rng.seed, history or 0) if record else None
+
+        self.inventory = Inventory()
+        self.manor = Manor(self.rng)
+
+        # Manor.start est (row, col)
+        sr, sc = self.manor.start
+        self.player = Player(sr, sc, self.inventory)
+
+        self.message = (
+            "ZQSD pour choisir, ESPACE pour valider. "
+            "Objectif: atteindre l'Antechamber tout en haut."
+        )
+        self.draft: Optional[Draft] = None
+        self.game_over: Optional[str] = None
+
+        # événements (loot, effets...) pas encore lus par l'affichage
+        self.events: List[str] = []
+
+    @classmethod
+    def assemble(cls, rng: GameRng, manor: Manor, inventory: Inventory, player: Player,
+                 message: str = "", draft: Optional[Draft] = None,
+                 game_over: Optional[str] = None) -> "GameState":
+        """État reconstruit à partir de ses parties (cf. savegame.loads), sans historique."""
+        self = cls.__new__(cls)
+        self.rng = rng
+        self.history = None
+        self.log = None
+        self.inventory = inventory
+        self.manor = manor
+        self.player = player
+        self.message = message
+        self.draft = draft
+        self.game_over = game_over
+        self.events = []
+        return self
+
+    # ------------------ CLONE / SNAPSHOT ------------------
+
+    def clone(self) -> "GameState":
+        """
+        Copie indépendante et bon marché (manoir en copie sur écriture), avec
+        des flux aléatoires dérivés (GameRng.fork) plutôt que recopiés.
+        """
+        other = GameState.__new__(GameState)
+        other.history = None
+        other.log = None
+        other.rng = self.rng.fork()
+        other.inventory = self.inventory.clone()
+        other.manor = self.manor.clone(other.rng)
+        other.player = self.player.clone(other.inventory)
+        other.message = self.message
+        other.draft = None if self.draft is None else self.draft.copy()
+        other.game_over = self.game_over
+        other.events = []
+        return other
+
+    def snapshot(self) -> Tuple:
+        """État restaurable par restore (les événements non lus n'en font pas partie)."""
+        return (
+            self.rng.getstate(),
+            self.manor.snapshot(),
+            self.inventory.snapshot(),
+            self.player.snapshot(),
+            self.message,
+            None if self.draft is None else self.draft.copy(),
+            self.game_over,
+            None if self.history is None else self.history.state(),
+            None if self.log is None else len(self.log),
+        )
+
+    def restore(self, snapshot: Tuple) -> None:
+        """
+        Revient au snapshot, historique compris (piles persistantes). Le journal
+        est ramené au snapshot (ou abandonné s'il est plus court).
+        """
+        rng, manor, inventory, player, message, draft, game_over, history, logged = snapshot
+        self.rng.setstate(rng)
+        self.manor.restore(manor)
+        self.inventory.restore(inventory)
+        self.player.restore(player)
+        self.message = message
+        self.draft = None if draft is None else draft.copy()
+        self.game_over = game_over
+        if self.history is not None:
+            if history is None:
+                self.history.clear()
+            else:
+                self.history.set_state(history)
+        if self.log is not None:
+            if logged is not None and logged <= len(self.log):
+                del self.log.actions[logged:]
+                self.log.final_hash = None
+            else:
+                self.log = None
+
+    # ------------------ ANNULER / RÉTABLIR ------------------
+
+    def _scene(self) -> Tuple:
+        return self.message, None if self.draft is None else self.draft.copy(), self.game_over
+
+    def _capture(self) -> Tuple:
+        """État avant une action ; les pièces posées deviennent immuables (cf. Board.disown)."""
+        board = self.manor.board
+        board.disown()
+        return (
+            list(board.rooms),
+            len(self.manor.deck),
+            self.manor.zhash,
+            self.inventory.snapshot(),
+            self.player.snapshot(),
+            self._scene(),
+        )
+
+    def _record(self, before: Tuple) -> None:
+        """Compare l'état courant à before et empile le Delta (sauf action sans effet)."""
+        rooms, deck_size, manor_hash, inventory, player, scene = before
+        deck = self.manor.deck
+        cells = tuple(
+            (idx, old, new)
+            for idx, (old, new) in enumerate(zip(rooms, self.manor.board.rooms))
+            if old is not new
+        )
+        drawn = ()
+        if len(deck) != deck_size:
+            drawn = tuple(
+                new.definition for _idx, _old, new in cells
+                if new is not None and new.definition not in deck
+            )
+        changed = self.inventory.changes_since(inventory)
+        position = self.player.snapshot()
+        scene_now = self._scene()
+        if not (cells or changed or position != player
+                or (scene[1] is None) != (scene_now[1] is None) or scene[2] != scene_now[2]):
+            return
+        self.history.record(Delta(
+            cells, drawn, (manor_hash, self.manor.zhash), changed,
+            (player, position), (scene, scene_now),
+        ))
+
+    def _replay(self, delta: Delta, forward: bool) -> None:
+        side = 1 if forward else 0
+        self.manor.replay_cells(
+            [(idx, pair[side]) for idx, *pair in delta.cells],
+            delta.drawn,
+            put_back=not forward,
+            zhash=delta.manor_hash[side],
+        )
+        self.inventory.restore_fields({name: pair[side] for name, *pair in delta.inventory})
+        self.player.restore(delta.player[side])
+        self.message, draft, self.game_over = delta.scene[side]
+        self.draft = None if draft is None else draft.copy()
+
+    def undo(self) -> bool:
+        """Annule la dernière action. False s'il n'y a rien à annuler."""
+        if self.log is not None:
+            self.log.append(("undo",))
+        delta = self.history.undo() if self.history is not None else None
+        if delta is None:
+            return False
+        self._replay(delta, forward=False)
+        return True
+
+    def redo(self) -> bool:
+        """Rejoue la dernière action annulée. False s'il n'y en a pas."""
+        if self.log is not None:
+            self.log.append(("redo",))
+        delta = self.history.redo() if self.history is not None else None
+        if delta is None:
+            return False
+        self._replay(delta, forward=True)
+        return True
+
+    # ------------------ ACCÈS ------------------
+
+    def current_room(self):
+        r, c = self.player.r, self.player.c
+        return self.manor.grid[r][c]
+
+    def state_hash(self) -> int:
+        """
+        Hash de Zobrist de l'état complet : grille, pioche, joueur, inventaire,
+        et tirage en cours s'il y en a un. O(1) hors tirage (3 hash incrémentaux).
+        """
+        h = self.manor.zhash ^ self.player.zhash ^ self.inventory.zhash
+        if self.draft is not None:
+            for slot, cand in enumerate(self.draft.candidates):
+                orientation = self.draft.orientations[slot] if slot < len(self.draft.orientations) else 0
+                h ^= zobrist.draft_key(slot, cand.room.index, orientation)
+        return h
+
+    def pop_events(self) -> List[str]:
+        events, self.events = self.events, []
+        return events
+
+    # ------------------ ACTIONS ------------------
+
+    def apply(self, action: Tuple) -> None:
+        """
+        Exécute une action sous forme de tuple :
+        ("face", dname), ("advance",), ("choose", index), ("reroll",),
+        ("undo",) ou ("redo",).
+        """
+        kind = action[0]
+        if kind == "face":
+            self.face(action[1])
+        elif kind == "advance":
+            self.advance()
+        elif kind == "choose":
+            self.choose_candidate(action[1])
+        elif kind == "reroll":
+            self.reroll()
+        elif kind == "undo":
+            self.undo()
+        elif kind == "redo":
+            self.redo()
+        else:
+            raise ValueError(f"action inconnue : {action!r}")
+
+    def face(self, dname: str) -> None:
+        """Oriente le joueur (up/down/left/right ; autre valeur ignorée)."""
+        if dname in DIRECTIONS:
+            self._face(dname)
+
+    @_recorded("face")
+    def _face(self, dname: str) -> None:
+        self.player.set_dir(dname)
+
+    @_recorded("advance")
+    def advance(self) -> None:
+        """Franchit la porte face au joueur, ou ouvre un tirage si la case est vide."""
+        if self.game_over or self.draft is not None:
+            return
+
+        dname = self.player.dir
+        dr, dc = DIRECTIONS[dname]
+        r, c = self.player.r + dr, self.player.c + dc
+
+        if not inside(r, c):
+            self.message = "Un mur bloque ce côté."
+            return
+
+        here = self.current_room()
+        if not here.has_door(DOOR_INDEX[dname]):
+            self.message = "Aucune porte de ce côté."
+            return
+
+        # pièce déjà existante
+        if self.manor.grid[r][c] is not None:
+            self._enter(r, c)
+            return
+
+        # nouvelle pièce : porte verrouillée
+        lock = self.manor.lock_level_for_row(r)
+        if not self.inventory.can_open(lock):
+            if lock == 1 and self.inventory.lockpick:
+                pass
+            else:
+                self.message = f"Porte verrouillée (niv {lock}). Il te faut des clés."
+                return
+        self.inventory.spend_for_lock(lock)
+
+        cands = self.manor.draw_candidates(r, c, dname)
+        if not cands:
+            self.message = "Aucune pièce admissible ici…"
+            return
+        self.draft = Draft((r, c), dname, cands)
+        self.draft.roll_orientations(self.rng.rotations)
+
+    @_recorded("reroll")
+    def reroll(self) -> bool:
+        """Relance le tirage en cours contre 1 dé."""
+        draft = self.draft
+        if draft is None or self.inventory.dice <= 0:
+            return False
+        self.inventory.use_dice(1)
+        r, c = draft.pos
+        draft.candidates = self.manor.draw_candidates(r, c, draft.from_dir)
+        draft.roll_orientations(self.rng.rotations)
+        return True
+
+    @_recorded("choose")
+    def choose_candidate(self, index: int) -> Optional[Tuple[int, int, CompiledRoom]]:
+        """Pose le candidat index du tirage en cours et y entre. Renvoie (r, c, CompiledRoom)."""
+        draft = self.draft
+        if draft is None or not 0 <= index < len(draft.candidates):
+            return None
+
+        choice = draft.candidates[index]
+        cost = {"gems": -choice.gem_cost}
+        if not self.inventory.can_apply(cost):
+            return None
+        r, c = draft.pos
+        orientation = draft.orientations[index]
+        # l'orientation est validée contre choice.options, sans recalcul
+        if not self.manor.place_room(choice, r, c, draft.from_dir, orientation=orientation):
+            return None
+        self.inventory.apply(cost)
+        self.draft = None
+
+        self._fire(choice.room, DRAFT)
+        self._enter(r, c)
+        return (r, c, choice.room)
+
+    # ------------------ RÈGLES ------------------
+
+    def _fire(self, rd: CompiledRoom, trigger: str) -> None:
+        message = apply_room_effect(self.inventory, rd, self.rng.effects, trigger)
+        if message:
+            self.events.append(f"{rd.name}: {message}")
+
+    def _enter(self, r: int, c: int) -> None:
+        """Déplace le joueur dans la pièce (r, c) : pas, effets, loot, fin de partie."""
+        self.player.r, self.player.c = r, c
+        self.player.use_step()
+        # loot_room modifie la pièce : ne pas toucher une pièce partagée avec un clone
+        room = self.manor.mutable_room(r, c)
+        rd = get_room_def(room)
+        was_looted = room.looted
+        self._fire(rd, ENTER)
+        if not was_looted:
+            self._fire(rd, FIRST)
+        if PASSIVE_ROOMS:
+            for placed in self.manor.board.rooms:
+                if placed is not None and placed.index in PASSIVE_ROOMS:
+                    self._fire(placed.definition, PASSIVE)
+        for m in loot_room(self.inventory, room, self.rng.loot):
+            self.events.append(f"{rd.name}: {m}")
+        if room.looted and not was_looted:
+            self.manor.note_looted(r, c)
+        self.post_move_check()
+
+    def post_move_check(self):
+        if self.inventory.steps <= 0:
+            self.game_over = "Défaite: plus de pas."
+            return
+        if (self.player.r, self.player.c) == self.manor.goal:
+            self.game_over = "Victoire! Tu as atteint l'Antechamber."
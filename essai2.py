@@ -2,6 +2,8 @@ import pygame
 from pygame import Rect
 import math
 
+from layers import LAYERS, vertical_gradient
+
 # -------------------- FENÊTRE --------------------
 W, H = 800, 600
 FPS = 60
@@ -61,13 +63,16 @@ card_hover = [0.0, 0.0, 0.0]
 can_move = False           # peut bouger 1 fois après avoir choisi une chambre
 
 # -------------------- FOND GRADIENT GAUCHE --------------------
-LEFT_BG = pygame.Surface((LEFT_W, H)).convert()
-for y in range(H):
-    t = y / max(H - 1, 1)
-    r = int(20 + 10 * (1 - t))
-    g = int(22 + 8 * (1 - t))
-    b = int(28 + 6 * (1 - t))
-    pygame.draw.line(LEFT_BG, (r, g, b), (0, y), (LEFT_W, y))
+# calque partagé (cf. layers.py) : dessiné une fois, recopié à chaque image
+LEFT_BG_TOP, LEFT_BG_BOTTOM = (30, 30, 34), (20, 22, 28)
+
+
+def left_background():
+    return LAYERS.get(
+        "essai2.left", (LEFT_W, H),
+        lambda surf: vertical_gradient(surf, LEFT_BG_TOP, LEFT_BG_BOTTOM),
+        theme=(LEFT_BG_TOP, LEFT_BG_BOTTOM),
+    )
 
 # -------------------- LAYOUT PANNEAU DROIT --------------------
 def layout_right(panel):
@@ -114,7 +119,7 @@ def layout_right(panel):
 
 # -------------------- DESSIN --------------------
 def draw_left():
-    screen.blit(LEFT_BG, (0, 0))
+    screen.blit(left_background(), (0, 0))
 
     grid_outer = Rect(0, 0, LEFT_W, H).inflate(-10, -10)
     pygame.draw.rect(screen, (40, 42, 50), grid_outer, 2, border_radius=14)
@@ -0,0 +1,113 @@
+"""
+Historique annuler / rétablir d'une partie.
+
+Chaque action jouée laisse un Delta : les cases changées (pièce avant /
+après), les salles sorties de la pioche, les ressources et la position
+modifiées. Les pièces et valeurs référencées ne sont jamais modifiées
+ensuite (cf. Board.disown), un Delta ne copie donc rien.
+
+Les deltas sont chaînés en listes persistantes (chaque nœud pointe vers le
+précédent et n'est jamais modifié) : annuler / rétablir déplace un nœud d'une
+pile à l'autre en O(1), sans copier les deltas. La mémoire est bornée par
+capacity : au-delà, les plus anciens deltas sont oubliés (O(1) amorti).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Delta:
+    """
+    Changements d'une action, dans les deux sens :
+    - cells : (case, pièce avant, pièce après)
+    - drawn : CompiledRoom retirées de la pioche par l'action
+    - manor_hash / player : (avant, après) ; player = Player.snapshot()
+    - inventory : (champ, avant, après)
+    - scene : (message, tirage, fin de partie) avant puis après
+    """
+    cells: Tuple[Tuple[int, Any, Any], ...]
+    drawn: Tuple[Any, ...]
+    manor_hash: Tuple[int, int]
+    inventory: Tuple[Tuple[str, Any, Any], ...]
+    player: Tuple[Tuple, Tuple]
+    scene: Tuple[Tuple, Tuple]
+
+
+class _Node:
+    """Maillon immuable d'une pile persistante."""
+
+    __slots__ = ("delta", "parent", "depth")
+
+    def __init__(self, delta: Delta, parent: Optional["_Node"]):
+        self.delta = delta
+        self.parent = parent
+        self.depth = 1 if parent is None else parent.depth + 1
+
+
+def _truncate(node: Optional[_Node], keep: int) -> Optional[_Node]:
+    """Nouvelle pile avec les `keep` deltas les plus récents de node (nœuds reconstruits)."""
+    recent = []
+    while node is not None and len(recent) < keep:
+        recent.append(node.delta)
+        node = node.parent
+    top = None
+    for delta in reversed(recent):
+        top = _Node(delta, top)
+    return top
+
+
+class History:
+    """Piles persistantes des deltas annulables (past) et rétablissables (future)."""
+
+    def __init__(self, capacity: int = 10_000):
+        if capacity <= 0:
+            raise ValueError("capacity doit être > 0")
+        self.capacity = capacity
+        self._past: Optional[_Node] = None
+        self._future: Optional[_Node] = None
+
+    def __len__(self) -> int:
+        return 0 if self._past is None else self._past.depth
+
+    @property
+    def can_undo(self) -> bool:
+        return self._past is not None
+
+    @property
+    def can_redo(self) -> bool:
+        return self._future is not None
+
+    def record(self, delta: Delta) -> None:
+        """Nouvelle action : s'empile sur past, la branche future est abandonnée."""
+        self._past = _Node(delta, self._past)
+        self._future = None
+        # on laisse grandir jusqu'à 2x capacity avant de couper : O(1) amorti
+        if self._past.depth > 2 * self.capacity:
+            self._past = _truncate(self._past, self.capacity)
+
+    def undo(self) -> Optional[Delta]:
+        node = self._past
+        if node is None:
+            return None
+        self._past = node.parent
+        self._future = _Node(node.delta, self._future)
+        return node.delta
+
+    def redo(self) -> Optional[Delta]:
+        node = self._future
+        if node is None:
+            return None
+        self._future = node.parent
+        self._past = _Node(node.delta, self._past)
+        return node.delta
+
+    def state(self) -> Tuple[Optional[_Node], Optional[_Node]]:
+        """Les deux piles, en O(1) : les nœuds ne changent jamais (cf. GameState.snapshot)."""
+        return self._past, self._future
+
+    def set_state(self, state: Tuple[Optional[_Node], Optional[_Node]]) -> None:
+        self._past, self._future = state
+
+    def clear(self) -> None:
+        self._past = self._future = None
@@ -1,87 +1,220 @@
 # inventory/inventory.py
+from operator import attrgetter
+from typing import Any, Dict, Mapping, Tuple
+
+from zobrist import resource_key
+
+# ressources, dans l'ordre des snapshots
+COUNTERS = ("steps", "coins", "gems", "keys", "dice")
+PERMANENTS = ("lockpick", "rabbit_foot", "metal_detector", "shovel")
+FIELDS = COUNTERS + PERMANENTS
+
+# champs pris en compte dans le hash de Zobrist (nom -> numéro de ressource)
+HASHED_FIELDS = {
+    "steps": 0,
+    "coins": 1,
+    "gems": 2,
+    "keys": 3,
+    "dice": 4,
+    "lockpick": 5,
+    "rabbit_foot": 6,
+    "metal_detector": 7,
+    "shovel": 8,
+}
+
+# champs d'un snapshot : ressources puis hash
+STATE_FIELDS = FIELDS + ("zhash",)
+
+_set = object.__setattr__
+_get_state = attrgetter(*STATE_FIELDS)
+
 
 class Inventory:
+    """
+    Ressources du joueur (attributs à slots).
+
+    apply(delta) applique un lot de changements d'un seul coup : si l'un des
+    coûts ne peut pas être payé, rien n'est modifié. version augmente à
+    chaque changement effectif (l'affichage sait ainsi quand se redessiner) ;
+    zhash suit les valeurs (hash de Zobrist).
+    """
+
+    __slots__ = STATE_FIELDS + ("version",)
+
+    def __setattr__(self, name, value):
+        # affectation directe d'une ressource : hash et version tenus à jour
+        if name in HASHED_FIELDS:
+            self._put(name, value)
+        else:
+            _set(self, name, value)
+
     def __init__(self):
-        # ressources consommables
-        self.steps = 1
-        self.coins = 999
-        self.gems = 999
-        self.keys = 999
-        self.dice = 999
-
-        # objets permanents
-        self.lockpick = True
-        self.rabbit_foot = True
-        self.metal_detector = True
-        self.shovel = True
+        values = {
+            # ressources consommables
+            "steps": 1,
+            "coins": 999,
+            "gems": 999,
+            "keys": 999,
+            "dice": 999,
+            # objets permanents
+            "lockpick": True,
+            "rabbit_foot": True,
+            "metal_detector": True,
+            "shovel": True,
+        }
+        h = 0
+        for name, value in values.items():
+            _set(self, name, value)
+            h ^= resource_key(HASHED_FIELDS[name], value)
+        _set(self, "zhash", h)
+        _set(self, "version", 0)
+
+    # ============================================
+    # LOTS DE CHANGEMENTS
+    # ============================================
+    def _put(self, name: str, value) -> None:
+        """Un seul champ (chemin rapide de _commit)."""
+        old = getattr(self, name)
+        if old != value:
+            field = HASHED_FIELDS[name]
+            _set(self, "zhash", self.zhash ^ resource_key(field, old) ^ resource_key(field, value))
+            _set(self, name, value)
+            _set(self, "version", self.version + 1)
+
+    def _commit(self, values: Mapping[str, Any]) -> None:
+        """Nouvelles valeurs déjà validées : une mise à jour du hash par champ, une version."""
+        h = self.zhash
+        changed = False
+        for name, value in values.items():
+            old = getattr(self, name)
+            if old == value:
+                continue
+            field = HASHED_FIELDS[name]
+            h ^= resource_key(field, old) ^ resource_key(field, value)
+            _set(self, name, value)
+            changed = True
+        if changed:
+            _set(self, "zhash", h)
+            _set(self, "version", self.version + 1)
+
+    def _resolve(self, delta: Mapping[str, int]):
+        """Valeurs après delta, ou None si un coût ne peut pas être payé."""
+        values = {}
+        for name, change in delta.items():
+            if name not in HASHED_FIELDS:
+                raise KeyError(f"ressource inconnue : {name}")
+            if name in PERMANENTS:
+                # > 0 : objet obtenu, < 0 : objet consommé (il faut l'avoir)
+                if change < 0 and not getattr(self, name):
+                    return None
+                if change:
+                    values[name] = change > 0
+                continue
+            value = getattr(self, name) + change
+            if change < 0 and value < 0:
+                return None
+            values[name] = value
+        return values
+
+    def can_apply(self, delta: Mapping[str, int]) -> bool:
+        return self._resolve(delta) is not None
+
+    def apply(self, delta: Mapping[str, int]) -> bool:
+        """
+        Applique tous les changements de delta (ressource -> variation) ou
+        aucun : False si l'un des coûts dépasse ce que l'on possède.
+        """
+        values = self._resolve(delta)
+        if values is None:
+            return False
+        self._commit(values)
+        return True
+
+    # ============================================
+    # SNAPSHOT
+    # ============================================
+    def snapshot(self) -> Tuple:
+        """Valeurs courantes, dans l'ordre de STATE_FIELDS (hash compris)."""
+        return _get_state(self)
+
+    def restore(self, snapshot: Tuple) -> None:
+        # copie directe : le hash sauvegardé correspond déjà aux valeurs
+        for name, value in zip(STATE_FIELDS, snapshot):
+            _set(self, name, value)
+        _set(self, "version", self.version + 1)
+
+    def changes_since(self, snapshot: Tuple) -> Tuple[Tuple[str, Any, Any], ...]:
+        """(champ, avant, après) des champs modifiés depuis snapshot."""
+        now = _get_state(self)
+        if now == snapshot:
+            return ()
+        return tuple(
+            (name, old, new)
+            for name, old, new in zip(STATE_FIELDS, snapshot, now)
+            if old != new
+        )
+
+    def restore_fields(self, values: Mapping[str, Any]) -> None:
+        """Remet certains champs (hash compris) tels quels, sans recalcul."""
+        for name, value in values.items():
+            _set(self, name, value)
+        _set(self, "version", self.version + 1)
+
+    def clone(self):
+        other = Inventory.__new__(Inventory)
+        for name, value in zip(STATE_FIELDS, _get_state(self)):
+            _set(other, name, value)
+        _set(other, "version", self.version)
+        return other
 
     # ============================================
     # CONSOMMATION
     # ============================================
     def use_step(self, n=1):
-        self.steps -= n
+        # les pas peuvent tomber à 0 ou moins : c'est la défaite
+        self._put("steps", self.steps - n)
         return self.steps
 
     def use_coins(self, n):
-        if self.coins >= n:
-            self.coins -= n
-            return True
-        return False
+        return self.apply({"coins": -n})
 
     def use_gems(self, n):
-        if self.gems >= n:
-            self.gems -= n
-            return True
-        return False
+        return self.apply({"gems": -n})
 
     def use_keys(self, n=1):
-        if self.keys >= n:
-            self.keys -= n
-            return True
-        return False
+        return self.apply({"keys": -n})
 
     def use_dice(self, n=1):
-        if self.dice >= n:
-            self.dice -= n
-            return True
-        return False
+        return self.apply({"dice": -n})
 
     # ============================================
     # AJOUT
     # ============================================
     def add_steps(self, n):
-        self.steps += n
+        self._put("steps", self.steps + n)
 
     def add_coins(self, n):
-        self.coins += n
+        self._put("coins", self.coins + n)
 
     def add_gems(self, n):
-        self.gems += n
+        self._put("gems", self.gems + n)
 
     def add_keys(self, n):
-        self.keys += n
+        self._put("keys", self.keys + n)
 
     def add_dice(self, n):
-        self.dice += n
+        self._put("dice", self.dice + n)
 
     # ============================================
     # PERMANENTS
     # ============================================
     def add_permanent(self, name):
-        if name == "lockpick":
-            self.lockpick = True
-        elif name == "rabbit_foot":
-            self.rabbit_foot = True
-        elif name == "metal_detector":
-            self.metal_detector = True
+        if name in PERMANENTS:
+            self._put(name, True)
 
     def has_permanent(self, name):
-        if name == "lockpick":
-            return self.lockpick
-        if name == "rabbit_foot":
-            return self.rabbit_foot
-        if name == "metal_detector":
-            return self.metal_detector
+        if name in PERMANENTS:
+            return getattr(self, name)
         return False
 
     # ============================================
@@ -98,18 +231,16 @@ class Inventory:
             return self.keys >= 2
         return False
 
-    def spend_for_lock(self, lock_level: int):
-        # Ne rien faire pour 0
-        if lock_level <= 0:
-            return
-
+    def lock_cost(self, lock_level: int) -> Dict[str, int]:
+        """Coût d'ouverture d'une porte, sous forme de delta pour apply."""
         if lock_level == 1:
-            # on privilégie la clé si dispo
-            if self.keys >= 1:
-                self.keys -= 1
-            # sinon lockpick utilisé "gratuitement"
-            # (si tu veux que lockpick soit consommé, ajoute un flag ici)
-        elif lock_level == 2:
-            # consomme 2 clés (en supposant que can_open a été vérifié avant)
-            if self.keys >= 2:
-                self.keys -= 2
+            # on privilégie la clé si dispo, sinon lockpick utilisé "gratuitement"
+            # (si tu veux que lockpick soit consommé, ajoute "lockpick": -1 ici)
+            return {"keys": -1} if self.keys >= 1 else {}
+        if lock_level == 2:
+            return {"keys": -2}
+        return {}
+
+    def spend_for_lock(self, lock_level: int) -> bool:
+        """Paie l'ouverture (rien si le coût ne peut pas être payé)."""
+        return self.apply(self.lock_cost(lock_level))
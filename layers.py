@@ -0,0 +1,54 @@
+"""
+Calques statiques (fonds d'écran, panneaux, dégradés).
+
+Un calque est une surface composée une seule fois par sa fonction de
+construction, puis simplement recopiée à chaque image. Il est repéré par
+son nom et reconstruit seulement si la taille ou le thème demandés
+changent (redimensionnement de la fenêtre, changement de couleurs).
+"""
+
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import pygame
+
+Size = Tuple[int, int]
+Color = Tuple[int, int, int]
+
+
+class LayerCache:
+    def __init__(self):
+        # nom -> ((taille, thème), surface)
+        self._layers: Dict[str, Tuple[Tuple[Size, Hashable], pygame.Surface]] = {}
+
+    def get(self, name: str, size: Size, build: Callable[[pygame.Surface], None],
+            theme: Hashable = None) -> pygame.Surface:
+        """Calque name à la taille size ; build(surface) le dessine s'il manque ou a changé."""
+        key = (tuple(size), theme)
+        entry = self._layers.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        build(surface)
+        self._layers[name] = (key, surface)
+        return surface
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Oublie un calque (ou tous) : il sera reconstruit à la prochaine demande."""
+        if name is None:
+            self._layers.clear()
+        else:
+            self._layers.pop(name, None)
+
+
+LAYERS = LayerCache()
+
+
+def vertical_gradient(surface: pygame.Surface, top: Color, bottom: Color) -> None:
+    """Dégradé linéaire de top (première ligne) à bottom (dernière ligne)."""
+    w, h = surface.get_size()
+    for y in range(h):
+        t = y / max(h - 1, 1)
+        color = tuple(int(a + (b - a) * t) for a, b in zip(top, bottom))
+        pygame.draw.line(surface, color, (0, y), (w, y))
@@ -15,15 +15,21 @@ Fonctionnalités incluses (version D):
 
 import sys
 import os
-import random
+import struct
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 
 import pygame
 
+from engine import GameState
+from actionlog import ActionLog
+from history import History
+from layers import LAYERS
+import savegame
 from inventory.inventory import Inventory
-from rooms.room_data import RoomDef, ROOM_CATALOGUE
-from player import Player
-from manor import Manor, GRID_ROWS, GRID_COLS, OPPOSITE_DIR, DOOR_INDEX
+from rooms.catalogue import CATALOGUE
+from rooms.placement import FACINGS, PlacementRule
+from manor import Candidate, GRID_ROWS, GRID_COLS
 
 # ==========================
 # Constantes & couleurs
@@ -43,6 +49,15 @@ GRID_H = GRID_ROWS * TILE + (GRID_ROWS + 1) * MARGIN
 GRID_X = 40
 GRID_Y = HEADER_H + 24  # sous le header
 
+# Zones de l'écran
+HEADER_RECT = pygame.Rect(0, 0, WIDTH, HEADER_H)
+GRID_PANEL_RECT = pygame.Rect(GRID_X - 20, GRID_Y - 20, GRID_W + 40, GRID_H + 40)
+_SIDE_X = GRID_X + GRID_W + 40
+SIDE_RECT = pygame.Rect(_SIDE_X, HEADER_H + 20, WIDTH - _SIDE_X - 40, HEIGHT - HEADER_H - 40)
+# panneau latéral : inventaire en haut, journal et message en bas
+STATS_RECT = pygame.Rect(SIDE_RECT.x, SIDE_RECT.y, SIDE_RECT.width, SIDE_RECT.height - 150)
+LOG_RECT = pygame.Rect(SIDE_RECT.x, STATS_RECT.bottom, SIDE_RECT.width, SIDE_RECT.bottom - STATS_RECT.bottom)
+
 BG      = (18, 20, 26)
 PANEL   = (30, 34, 44)
 TEXT    = (235, 240, 255)
@@ -51,6 +66,8 @@ ACCENT  = (120, 180, 255)
 DANGER  = (230, 80, 80)
 SUCCESS = (90, 200, 140)
 OUTLINE = (240, 245, 255)
+BOARD_BG = (26, 30, 40)    # panneau autour de la grille
+CELL_BG  = (45, 50, 62)    # case vide
 
 ROOM_COLORS = {
     "blue":   (70, 110, 170),
@@ -61,13 +78,6 @@ ROOM_COLORS = {
     "red":    (200, 80, 80),
 }
 
-# Directions (r, c)
-DIRS: Dict[str, Tuple[int, int]] = {
-    "up":    (-1, 0),
-    "down":  (1, 0),
-    "left":  (0, -1),
-    "right": (0, 1),
-}
 KEY_TO_DIR = {
     pygame.K_z: "up",
     pygame.K_w: "up",
@@ -77,6 +87,15 @@ KEY_TO_DIR = {
     pygame.K_d: "right",
 }
 
+# nombre d'actions annulables (touche U)
+UNDO_LIMIT = 10_000
+# journal de la dernière partie, écrit en quittant (python replay.py last_game.bplg)
+REPLAY_PATH = "last_game.bplg"
+# sauvegarde rapide (F5 : sauver, F9 : reprendre)
+SAVE_PATH = "quicksave.bpsv"
+# mémoire max des textes déjà rendus (cf. TextCache)
+TEXT_CACHE_BYTES = 4 * 1024 * 1024
+
 
 # ==========================
 # Utilitaires
@@ -92,12 +111,80 @@ def grid_to_px(r: int, c: int) -> pygame.Rect:
     return pygame.Rect(x, y, TILE, TILE)
 
 
+def cell_region(r: int, c: int) -> pygame.Rect:
+    """Case et sa demi-marge : de quoi contenir les contours du joueur et du but."""
+    return grid_to_px(r, c).inflate(MARGIN, MARGIN)
+
+
 def draw_rounded(surface, color, rect, radius=16, width=0):
     pygame.draw.rect(surface, color, rect, width=width, border_radius=radius)
 
 
+class TextCache:
+    """
+    Surfaces de texte déjà rendues, par (police, texte, couleur) : une image
+    stable ne rastérise plus aucun glyphe. Les moins récemment utilisées
+    sont évincées au-delà de max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = TEXT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+
+    def render(self, font, s: str, color) -> pygame.Surface:
+        key = (font, s, tuple(color))
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            return surf
+
+        surf = font.render(s, True, color)
+        size = surf.get_pitch() * surf.get_height()
+        if size <= self.max_bytes:
+            self._surfaces[key] = surf
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _key, old = self._surfaces.popitem(last=False)
+                self.bytes -= old.get_pitch() * old.get_height()
+        return surf
+
+
+TEXT_CACHE = TextCache()
+
+
+class SpriteCache:
+    """
+    Icônes de pièces déjà tournées et mises à l'échelle, par
+    (pièce, orientation, taille) : chaque variante est calculée une fois,
+    au premier affichage. La taille fait partie de la clé : une autre
+    taille de case donne de nouvelles variantes, jamais une image périmée ;
+    invalidate() libère les anciennes quand la mise en page change.
+    """
+
+    def __init__(self, images: Dict[str, pygame.Surface]):
+        self.images = images
+        self._sprites: Dict[Tuple[str, int, Tuple[int, int]], pygame.Surface] = {}
+
+    def get(self, name: str, orientation: int, size: Tuple[int, int]) -> Optional[pygame.Surface]:
+        """Icône de name tournée de orientation quarts de tour, None si pas d'image."""
+        key = (name, orientation % 4, size)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            img = self.images.get(name)
+            if img is None:
+                return None
+            rotated = pygame.transform.rotate(img, -90 * key[1])   # change sign if flipped
+            sprite = pygame.transform.scale(rotated, size)
+            self._sprites[key] = sprite
+        return sprite
+
+    def invalidate(self) -> None:
+        self._sprites.clear()
+
+
 def text(surface, s, font, color, center=None, topleft=None):
-    surf = font.render(s, True, color)
+    surf = TEXT_CACHE.render(font, s, color)
     rect = surf.get_rect()
     if center:
         rect.center = center
@@ -107,85 +194,25 @@ def text(surface, s, font, color, center=None, topleft=None):
     return rect
 
 
-def get_room_def(room_obj):
-    """Compat : Room wrapper ou RoomDef direct."""
-    if hasattr(room_obj, "definition"):
-        return room_obj.definition
-    return room_obj
-
-
-# ==========================
-# Effets de pièces
-# ==========================
-
-def apply_room_effect(inv: Inventory, rd: RoomDef):
-    eid = rd.effect_id
-    if not eid:
-        return
-
-    value = rd.effect_value
-    if isinstance(value, tuple):
-        import random
-        value = random.randint(value[0], value[1])
-
-    if eid == "add_step":
-        inv.add_steps(value)
-    elif eid == "add_coin":
-        inv.add_coins(value)
-    elif eid == "add_gem":
-        inv.add_gems(value)
-    elif eid == "add_key":
-        inv.add_keys(value)
-    elif eid == "lockpick":
-        inv.add_permanent("lockpick")
-    elif eid == "metaldetector":
-        inv.add_permanent("metal_detector")
+FACING_NAMES = {"north": "N", "east": "E", "south": "S", "west": "O"}
 
-# ==========================
-# room_loot function
-#=========================
-
-def loot_room(inv: Inventory, room):
-    if room.looted:
-        return []
-
-    rd = room.definition
-    import random
-    messages = []
-
-    for obj_name, (mn, mx) in rd.objects_in_room.items():
-        qty = random.randint(mn, mx)
-        if qty <= 0:
-            continue
-
-        if obj_name in ("apple", "banana", "cupcake", "orange"):
-            inv.add_steps(2 * qty)
-            messages.append(f"+{2 * qty} pas (nourriture)")
-        elif obj_name == "key":
-            inv.add_keys(qty)
-            messages.append(f"+{qty} clé(s)")
-        elif obj_name == "gem":
-            inv.add_gems(qty)
-            messages.append(f"+{qty} gemme(s)")
-        elif obj_name == "coin":
-            inv.add_coins(qty)
-            messages.append(f"+{qty} pièce(s)")
-        elif obj_name == "dice":
-            inv.add_dice(qty)
-            messages.append(f"+{qty} dé(s)")
-        elif obj_name == "lockpick":
-            inv.add_permanent("lockpick")
-            messages.append("Kit de crochetage obtenu")
-        elif obj_name == "metaldetector":
-            inv.add_permanent("metal_detector")
-            messages.append("Détecteur de métal obtenu")
-        elif obj_name == "paw":
-            inv.add_permanent("rabbit_foot")
-            messages.append("Patte de lapin obtenue")
-
-    room.looted = True
-    return messages
 
+def placement_label(rule: PlacementRule) -> Optional[str]:
+    """Résumé court d'une règle de placement, None si elle n'impose rien."""
+    parts = []
+    if rule.border is not None:
+        parts.append("bordure" if rule.border else "intérieur")
+    if rule.ranks is not None:
+        lo, hi = rule.ranks
+        parts.append(f"rang {lo}" if lo == hi else f"rangs {lo}-{hi}")
+    if rule.wing is not None:
+        parts.append("aile ouest" if rule.wing == "west" else "aile est")
+    if rule.cell is not None:
+        parts.append(f"case {rule.cell[0]},{rule.cell[1]}")
+    facings = [FACING_NAMES[name] for name, bit in FACINGS.items() if rule.from_facings >> bit & 1]
+    if len(facings) < 4:
+        parts.append("depuis " + "/".join(facings))
+    return ", ".join(parts) or None
 
 
 # ==========================
@@ -193,59 +220,51 @@ def loot_room(inv: Inventory, room):
 # ==========================
 
 class DrawUI:
+    """Affichage du tirage en cours (game.state.draft) et saisie clavier associée."""
+
     def __init__(self, font, font_small, game: "Game"):
         self.font = font
         self.font_small = font_small
         self.game = game
-        self.active = False
-        self.candidates: List[RoomDef] = []
         self.selected = 0
-        self.pos: Tuple[int, int] = (0, 0)   # (row, col)
-        self.from_dir: str = "up"
 
-        # nouveaux : orientation et portes pour chaque candidat
-        self.orientations: List[int] = []
-        self.doors_list: List[Tuple[bool, bool, bool, bool]] = []
+    @property
+    def active(self) -> bool:
+        return self.game.state.draft is not None
 
-    def open(self, candidates: List[RoomDef], pos: Tuple[int, int], from_dir: str):
-        self.active = True
-        self.candidates = candidates
-        self.selected = 0
-        self.pos = pos
-        self.from_dir = from_dir
-        self._compute_orientations()
+    @property
+    def candidates(self) -> List[Candidate]:
+        draft = self.game.state.draft
+        return draft.candidates if draft is not None else []
+
+    @property
+    def orientations(self) -> List[int]:
+        draft = self.game.state.draft
+        return draft.orientations if draft is not None else []
 
+    @property
+    def doors_list(self) -> List[int]:
+        draft = self.game.state.draft
+        return draft.doors_list if draft is not None else []
 
-    def close(self):
-        self.active = False
+    def open(self):
+        self.selected = 0
 
-    def handle_event(self, e, inventory: Inventory, manor: Manor):
+    def handle_event(self, e):
         if not self.active:
             return None
+        state = self.game.state
         if e.type == pygame.KEYDOWN:
             if e.key in (pygame.K_LEFT, pygame.K_a):
                 self.selected = (self.selected - 1) % len(self.candidates)
             elif e.key in (pygame.K_RIGHT, pygame.K_d):
                 self.selected = (self.selected + 1) % len(self.candidates)
             elif e.key == pygame.K_r:
-                if inventory.dice > 0:
-                    inventory.use_dice(1)
-                    r, c = self.pos
-                    self.candidates = manor.draw_candidates(r, c, self.from_dir)
+                if state.reroll():
                     self.selected = 0
-                    self._compute_orientations()
 
             elif e.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                choice = self.candidates[self.selected]
-                cost = choice.gem_cost if not isinstance(choice.gem_cost, tuple) else choice.gem_cost[0]
-                if not inventory.use_gems(cost):
-                    return None
-                r, c = self.pos
-                orientation = self.orientations[self.selected]
-                doors = self.doors_list[self.selected]
-                manor.place_room(choice, r, c, self.from_dir, orientation=orientation, doors=doors)
-                self.close()
-                return (r, c, choice)
+                return state.choose_candidate(self.selected)
         return None
 
     def draw(self, screen):
@@ -276,7 +295,8 @@ class DrawUI:
         start_x = panel.centerx - total_w // 2
         base_y = panel.top + 90
 
-        for i, rd in enumerate(self.candidates):
+        for i, cand in enumerate(self.candidates):
+            rd = cand.room
             rect = pygame.Rect(start_x + i * (card_w + gap), base_y, card_w, 360)
             sel = (i == self.selected)
             draw_rounded(screen, (60, 65, 80) if not sel else (80, 90, 110), rect, 18)
@@ -289,12 +309,10 @@ class DrawUI:
             text(screen, rd.name, self.font, (20, 20, 20), center=head.center)
 
             # IMAGE au centre de la carte
-            img = self.game.room_images.get(rd.name)
-            if img is not None:
-                size = int(card_w * 0.75)
-                orient = self.orientations[i] if i < len(self.orientations) else 0
-                rotated = pygame.transform.rotate(img, -90 * orient)   # change sign if flipped
-                thumb = pygame.transform.scale(rotated, (size, size))
+            size = int(card_w * 0.75)
+            orient = self.orientations[i] if i < len(self.orientations) else 0
+            thumb = self.game.sprites.get(rd.name, orient, (size, size))
+            if thumb is not None:
                 thumb_rect = thumb.get_rect(center=(rect.centerx, rect.top + 160))
                 screen.blit(thumb, thumb_rect)
                 y2 = rect.top + 260
@@ -307,47 +325,28 @@ class DrawUI:
                  topleft=(rect.left + 16, y2)); y2 += 28
             text(screen, f"Rareté: {rd.rarity}", self.font_small, TEXT,
                  topleft=(rect.left + 16, y2)); y2 += 28
-            text(screen, f"Coût gemmes: {rd.gem_cost}", self.font_small, TEXT,
+            text(screen, f"Coût gemmes: {cand.gem_cost}", self.font_small, TEXT,
                  topleft=(rect.left + 16, y2)); y2 += 28
 
             y2 += 8
             text(screen, "Portes:", self.font_small, SUBTLE,
                  topleft=(rect.left + 16, y2)); y2 += 24
             pr = ["↑", "→", "↓", "←"]
-            doors = self.doors_list[i] if i < len(self.doors_list) else rd.doors
-            s = " ".join([pr[j] if doors[j] else "·" for j in range(4)])
+            doors = self.doors_list[i] if i < len(self.doors_list) else rd.door_mask
+            s = " ".join([pr[j] if doors & (1 << j) else "·" for j in range(4)])
             text(screen, s, self.font, TEXT,
                  topleft=(rect.left + 16, y2)); y2 += 36
 
-            if getattr(rd, "placement_condition", None) == "border_only":
-                text(screen, "Placement: bordure", self.font_small, SUBTLE,
+            placement = placement_label(rd.placement)
+            if placement:
+                text(screen, f"Placement: {placement}", self.font_small, SUBTLE,
                      topleft=(rect.left + 16, y2)); y2 += 28
 
-            effect = getattr(rd, "effect_on_enter", None)
-            if effect:
+            effect = rd.effect
+            if effect is not None:
                 text(screen, f"Effet: {effect}", self.font_small, SUBTLE,
                      topleft=(rect.left + 16, y2)); y2 += 28
                 
-    def _compute_orientations(self):
-        """Choisit une orientation/portes pour chaque candidat à la position courante."""
-        self.orientations = []
-        self.doors_list = []
-
-        manor = self.game.manor
-        r, c = self.pos
-        entry_dir_name = OPPOSITE_DIR[self.from_dir]
-        entry_idx = DOOR_INDEX[entry_dir_name]
-
-        for rd in self.candidates:
-            options = manor._valid_rotations_for(rd, r, c, entry_idx)
-            if options:
-                orientation, doors = random.choice(options)
-            else:
-                orientation, doors = 0, rd.doors
-            self.orientations.append(orientation)
-            self.doors_list.append(tuple(doors))
-
-
 
 
 # ==========================
@@ -355,7 +354,7 @@ class DrawUI:
 # ==========================
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
         pygame.init()
         pygame.display.set_caption("Blue Prince — Prototype Pygame (D)")
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -371,7 +370,7 @@ class Game:
         ICON_DIR = os.path.join("rooms", "icon")
 
 
-        for rd in ROOM_CATALOGUE:
+        for rd in CATALOGUE:
             # nom logique de la room
             name = rd.name
 
@@ -385,150 +384,137 @@ class Game:
                 self.room_images[name] = img
             except Exception as e:
                 print(f"[WARN] pas d'image pour {name} ({path}) : {e}")
+        # variantes tournées / redimensionnées, calculées à la demande
+        self.sprites = SpriteCache(self.room_images)
 
-        # ---------- INVENTAIRE / MANOIR / JOUEUR ----------
-        self.inventory = Inventory()
-        self.manor = Manor()
-
-        # Manor.start est (row, col)
-        sr, sc = self.manor.start
-        self.player = Player(sr, sc, self.inventory)
-
-        self.message = (
-            "ZQSD pour choisir, ESPACE pour valider. "
-            "Objectif: atteindre l'Antechamber tout en haut."
-        )
+        # ---------- ÉTAT DE PARTIE (moteur sans pygame) ----------
+        # seed : rejoue exactement une partie (python main_game.py <graine>)
+        self.state = GameState(seed=seed, history=UNDO_LIMIT, record=True)
         self.draw_ui = DrawUI(self.font_big, self.font, self)
-        self.game_over: Optional[str] = None
 
         # petit historique d'événements (loot, effets...)
         # chaque entrée = (texte, ttl_en_frames)
         self.event_log: List[Tuple[str, int]] = []
+        # signatures des régions affichées (None : rien n'est encore à l'écran)
+        self._shown: Optional[Dict[object, object]] = None
 
+    # raccourcis vers l'état du moteur (utilisés par l'affichage)
+    @property
+    def inventory(self) -> Inventory:
+        return self.state.inventory
 
-    def current_room(self):
-        r, c = self.player.r, self.player.c
-        return self.manor.grid[r][c]
+    @property
+    def manor(self):
+        return self.state.manor
 
-    def try_action(self):
-        if self.game_over or self.draw_ui.active:
-            return
+    @property
+    def player(self):
+        return self.state.player
 
-        dname = self.player.dir
-        dr, dc = DIRS[dname]
-        r, c = self.player.r + dr, self.player.c + dc
+    @property
+    def message(self) -> str:
+        return self.state.message
 
-        if not inside(r, c):
-            self.message = "Un mur bloque ce côté."
-            return
+    @property
+    def game_over(self) -> Optional[str]:
+        return self.state.game_over
 
-        here = self.current_room()
-        idx_map = {"up": 0, "right": 1, "down": 2, "left": 3}
-        i = idx_map[dname]
-        if not here.placed_doors[i]:
-            self.message = "Aucune porte de ce côté."
-            return
-
-        # pièce déjà existante
-        if self.manor.grid[r][c] is not None:
-            self.player.r, self.player.c = r, c
-            self.player.use_step()
-            room = self.manor.grid[r][c]
-            rd = get_room_def(room)
-            apply_room_effect(self.inventory, rd)
-            msgs = loot_room(self.inventory, room)
-            for m in msgs:
-                self.push_event(f"{rd.name}: {m}")
-            self.post_move_check()
-            return
-
-
-        # nouvelle pièce : porte verrouillée
-        lock = self.manor.lock_level_for_row(r)
-        if not self.inventory.can_open(lock):
-            if lock == 1 and self.inventory.lockpick:
-                pass
-            else:
-                self.message = f"Porte verrouillée (niv {lock}). Il te faut des clés."
-                return
-        self.inventory.spend_for_lock(lock)
+    def current_room(self):
+        return self.state.current_room()
 
-        cands = self.manor.draw_candidates(r, c, dname)
-        if not cands:
-            self.message = "Aucune pièce admissible ici…"
-            return
-        self.draw_ui.open(cands, (r, c), dname)
+    def try_action(self):
+        self.state.advance()
+        if self.draw_ui.active:
+            self.draw_ui.open()
+        self._pull_events()
 
-    def post_move_check(self):
-        if self.inventory.steps <= 0:
-            self.game_over = "Défaite: plus de pas."
-            return
-        if (self.player.r, self.player.c) == self.manor.goal:
-            self.game_over = "Victoire! Tu as atteint l'Antechamber."
+    def _pull_events(self):
+        for m in self.state.pop_events():
+            self.push_event(m)
 
     def handle_events(self):
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
+            if e.type in (pygame.VIDEORESIZE, pygame.WINDOWSIZECHANGED):
+                # nouvelle taille de fenêtre : variantes d'icônes périmées, tout redessiner
+                self.sprites.invalidate()
+                self._shown = None
+            if e.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                # fenêtre redécouverte : l'écran n'a plus ce que render_dirty croit y avoir laissé
+                self._shown = None
             if e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
 
-                if self.draw_ui.active:
-                    placed = self.draw_ui.handle_event(e, self.inventory, self.manor)
-                    if placed:
-                        r, c, _ = placed
-                        self.player.r, self.player.c = r, c
-                        self.player.use_step()
-                        room = self.manor.grid[r][c]
-                        rd = get_room_def(room)
-                        apply_room_effect(self.inventory, rd)
-                        msgs = loot_room(self.inventory, room)
-                        for m in msgs:
-                            self.push_event(f"{rd.name}: {m}")
-                        self.post_move_check()
+                if e.key == pygame.K_F5:
+                    self.quick_save()
+                    continue
+                if e.key == pygame.K_F9:
+                    self.quick_load()
+                    continue
 
+                # U : annuler, Y : rétablir (aussi pendant un tirage)
+                if e.key in (pygame.K_u, pygame.K_y):
+                    done = self.state.undo() if e.key == pygame.K_u else self.state.redo()
+                    if done and self.draw_ui.active:
+                        self.draw_ui.open()
+                    continue
+
+                if self.draw_ui.active:
+                    self.draw_ui.handle_event(e)
+                    self._pull_events()
                     continue
 
                 if e.key in KEY_TO_DIR:
-                    self.player.set_dir(KEY_TO_DIR[e.key])
+                    self.state.face(KEY_TO_DIR[e.key])
                 elif e.key == pygame.K_SPACE:
                     self.try_action()
 
-    def draw_grid(self):
+    # ============================================
+    # AFFICHAGE
+    # ============================================
+    def _age_events(self):
+        """Fait vieillir les messages d'événements d'une image."""
+        new_log = []
+        for msg, ttl in self.event_log:
+            ttl -= 1
+            if ttl > 0:
+                new_log.append((msg, ttl))
+        self.event_log = new_log
+
+    def _build_background(self, surf: pygame.Surface):
+        """Tout ce qui ne change jamais : bandeau, panneaux, cases vides."""
+        surf.fill(BG)
+
         # Bandeau haut (titre)
-        header = pygame.Rect(0, 0, WIDTH, HEADER_H)
-        draw_rounded(self.screen, PANEL, header, 0)
+        draw_rounded(surf, PANEL, HEADER_RECT, 0)
         text(
-            self.screen,
+            surf,
             "Blue Prince — Prototype Pygame (Option D)",
             self.font_big, TEXT,
             center=(WIDTH // 2, 28)
         )
 
         # Panneau latéral droit
-        right_x = GRID_X + GRID_W + 40
-        right_w = WIDTH - right_x - 40
-        right_panel = pygame.Rect(
-            right_x,
-            HEADER_H + 20,
-            right_w,
-            HEIGHT - HEADER_H - 40
-        )
-
-        # mise à jour de la durée de vie des messages d'événements
-        new_log = []
-        for msg, ttl in self.event_log:
-            ttl -= 1
-            if ttl > 0:
-                new_log.append((msg, ttl))
-        self.event_log = new_log
-
+        draw_rounded(surf, PANEL, SIDE_RECT, 18)
 
+        # Panneau autour de la grille + cases vides
+        draw_rounded(surf, BOARD_BG, GRID_PANEL_RECT, 18)
+        for r in range(GRID_ROWS):
+            for c in range(GRID_COLS):
+                draw_rounded(surf, CELL_BG, grid_to_px(r, c), 10)
+
+    @property
+    def background(self) -> pygame.Surface:
+        # reconstruit seulement si la taille de l'écran ou le thème change
+        return LAYERS.get(
+            "main_game.background", self.screen.get_size(), self._build_background,
+            theme=(BG, PANEL, TEXT, BOARD_BG, CELL_BG),
+        )
 
-        draw_rounded(self.screen, PANEL, right_panel, 18)
+    def draw_side_panel(self):
+        right_panel = SIDE_RECT
 
         # Inventaire
         y = right_panel.y + 20
@@ -565,8 +551,8 @@ class Game:
             text(self.screen, " • " + " | ".join(perks),
                  self.font_small, TEXT,
                  topleft=(right_panel.x + 30, y))
-            
-                # Historique récent de loot / effets
+
+        # Historique récent de loot / effets
         log_y = right_panel.bottom - 140
         for msg, _ttl in reversed(self.event_log[-4:]):
             text(
@@ -586,95 +572,201 @@ class Game:
             topleft=(right_panel.x + 24, right_panel.bottom - 60)
         )
 
-        # Panneau autour de la grille
-        grid_panel = pygame.Rect(
-            GRID_X - 20,
-            GRID_Y - 20,
-            GRID_W + 40,
-            GRID_H + 40
-        )
-        draw_rounded(self.screen, (26, 30, 40), grid_panel, 18)
+    def draw_cell(self, r: int, c: int):
+        """Contenu de la case (r, c), sur le fond : pièce, but et joueur."""
+        rect = grid_to_px(r, c)
+        rm = self.manor.grid[r][c]
+        if rm is not None:
+            # rm peut être soit un CompiledRoom soit un objet Room avec .definition
+            rd = rm.definition if hasattr(rm, "definition") else rm
+
+            col = ROOM_COLORS.get(getattr(rd, "color", "blue"), (110, 110, 110))
+            inner = rect.inflate(-8, -8)
+            draw_rounded(self.screen, col, inner, 12)
+
+            # --- image de la room au centre ---
+            orient = getattr(rm, "orientation", 0)
+            thumb = self.sprites.get(rd.name, orient, (inner.width - 4, inner.height - 4))
+            if thumb is not None:
+                img_rect = thumb.get_rect(center=inner.center)
+                self.screen.blit(thumb, img_rect)
+            else:
+                # fallback texte si aucune image
+                text(
+                    self.screen,
+                    rd.name,
+                    self.font_small,
+                    (20, 20, 20),
+                    center=inner.center,
+                )
 
-        # Grille + rooms
-        for r in range(GRID_ROWS):
-            for c in range(GRID_COLS):
-                rect = grid_to_px(r, c)
-                draw_rounded(self.screen, (45, 50, 62), rect, 10)
+        # Joueur : surbrillance de la case courante
+        if (r, c) == (self.player.r, self.player.c):
+            # halo autour de la case
+            highlight = rect.inflate(8, 8)
+            pygame.draw.rect(self.screen, ACCENT, highlight, width=4, border_radius=14)
+
+            # petit marqueur de direction sur le bord de la case
+            dir_offsets = {
+                "up":    (0, -rect.height // 2),
+                "right": (rect.width // 2, 0),
+                "down":  (0, rect.height // 2),
+                "left":  (-rect.width // 2, 0),
+            }
+            off = dir_offsets[self.player.dir]
+            center = rect.center
+            tip = (center[0] + off[0] * 0.6, center[1] + off[1] * 0.6)
+            pygame.draw.line(self.screen, ACCENT, center, tip, 3)
 
-                rm = self.manor.grid[r][c]
-                if rm is None:
-                    continue
+        # But
+        if (r, c) == self.manor.goal:
+            pygame.draw.rect(self.screen, SUCCESS, rect.inflate(6, 6), 3, border_radius=10)
 
-                # rm peut être soit un RoomDef soit un objet Room avec .definition
-                rd = rm.definition if hasattr(rm, "definition") else rm
-
-                col = ROOM_COLORS.get(getattr(rd, "color", "blue"), (110, 110, 110))
-                inner = rect.inflate(-8, -8)
-                draw_rounded(self.screen, col, inner, 12)
-
-                # --- image de la room au centre ---
-                img = self.room_images.get(rd.name)
-                if img is not None:
-                    orient = getattr(rm, "orientation", 0)
-                    rotated = pygame.transform.rotate(img, -90 * orient)   # change sign if needed
-                    target_w = inner.width - 4
-                    target_h = inner.height - 4
-                    thumb = pygame.transform.scale(rotated, (target_w, target_h))
-                    img_rect = thumb.get_rect(center=inner.center)
-                    self.screen.blit(thumb, img_rect)
-                else:
-                    # fallback texte si aucune image
-                    text(
-                        self.screen,
-                        rd.name,
-                        self.font_small,
-                        (20, 20, 20),
-                        center=inner.center,
-                    )
-
-        # Joueur
-        # Joueur : surbrillance de la case courante
-        pr = grid_to_px(self.player.r, self.player.c)
-
-        # halo autour de la case
-        highlight = pr.inflate(8, 8)
-        pygame.draw.rect(self.screen, ACCENT, highlight, width=4, border_radius=14)
-
-        # petit marqueur de direction sur le bord de la case
-        dir_offsets = {
-            "up":    (0, -pr.height // 2),
-            "right": (pr.width // 2, 0),
-            "down":  (0, pr.height // 2),
-            "left":  (-pr.width // 2, 0),
+    def draw_game_over(self):
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 160))
+        self.screen.blit(overlay, (0, 0))
+        panel = pygame.Rect(WIDTH // 2 - 320, HEIGHT // 2 - 120, 640, 240)
+        draw_rounded(self.screen, PANEL, panel, 16)
+        text(self.screen, self.game_over, self.font_big, TEXT, center=panel.center)
+
+    # --- régions et signatures (rendu par rectangles modifiés) ---
+    def _regions(self):
+        """(rect, dessin par-dessus le fond) de chaque région qui peut changer."""
+        regions = {
+            "stats": (STATS_RECT, self.draw_side_panel),
+            "log": (LOG_RECT, self.draw_side_panel),
         }
-        off = dir_offsets[self.player.dir]
-        center = pr.center
-        tip = (center[0] + off[0] * 0.6, center[1] + off[1] * 0.6)
-        pygame.draw.line(self.screen, ACCENT, center, tip, 3)
-
+        for r in range(GRID_ROWS):
+            for c in range(GRID_COLS):
+                regions[(r, c)] = (cell_region(r, c), lambda r=r, c=c: self.draw_cell(r, c))
+        return regions
+
+    def _signatures(self) -> Dict[object, object]:
+        """Ce que montre chaque région : si la valeur change, il faut la redessiner."""
+        inv = self.inventory
+        player = self.player
+        sigs: Dict[object, object] = {
+            "stats": (id(inv), inv.version),
+            "log": (tuple(msg for msg, _ttl in self.event_log[-4:]), self.message),
+            "overlay": self._overlay_signature(),
+        }
+        grid = self.manor.grid
+        for r in range(GRID_ROWS):
+            row = grid[r]
+            for c in range(GRID_COLS):
+                rm = row[c]
+                sigs[(r, c)] = rm.bits if rm is not None else None
+        sigs[(player.r, player.c)] = (sigs[(player.r, player.c)], player.dir)
+        return sigs
 
-        # But
-        gr, gc = self.manor.goal
-        goal_rect = grid_to_px(gr, gc)
-        pygame.draw.rect(self.screen, SUCCESS, goal_rect.inflate(6, 6), 3, border_radius=10)
+    def _overlay_signature(self):
+        if self.game_over:
+            return ("game_over", self.game_over)
+        draft = self.state.draft
+        if draft is None:
+            return None
+        return (
+            "draft",
+            tuple(cand.room.index for cand in draft.candidates),
+            tuple(draft.orientations),
+            tuple(draft.doors_list),
+            self.draw_ui.selected,
+        )
 
-        # Overlay fin de partie
+    def draw_scene(self):
+        """Image complète : fond, régions par-dessus puis overlays."""
+        self.screen.blit(self.background, (0, 0))
+        for rect, draw in self._regions().values():
+            self.screen.set_clip(rect)
+            draw()
+        self.screen.set_clip(None)
         if self.game_over:
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 160))
-            self.screen.blit(overlay, (0, 0))
-            panel = pygame.Rect(WIDTH // 2 - 320, HEIGHT // 2 - 120, 640, 240)
-            draw_rounded(self.screen, PANEL, panel, 16)
-            text(self.screen, self.game_over, self.font_big, TEXT, center=panel.center)
+            self.draw_game_over()
+        if self.draw_ui.active:
+            self.draw_ui.draw(self.screen)
+
+    def render(self):
+        """Dessine une image complète de l'état courant (sans l'afficher)."""
+        self._age_events()
+        self.draw_scene()
+        self._shown = self._signatures()
+
+    def render_dirty(self) -> List[pygame.Rect]:
+        """
+        Redessine seulement les régions dont le contenu a changé depuis
+        l'image précédente ; renvoie les rectangles à présenter (vide si
+        rien n'a bougé). Sous un overlay tout l'écran est voilé : le
+        moindre changement redessine alors l'image entière.
+        """
+        self._age_events()
+        sigs = self._signatures()
+        shown = self._shown
+        if sigs == shown:
+            return []
+        self._shown = sigs
+        if shown is None or sigs["overlay"] is not None or shown["overlay"] is not None:
+            self.draw_scene()
+            return [self.screen.get_rect()]
+
+        regions = self._regions()
+        background = self.background
+        dirty = []
+        for key, sig in sigs.items():
+            if key == "overlay" or shown[key] == sig:
+                continue
+            rect, draw = regions[key]
+            self.screen.set_clip(rect)
+            self.screen.blit(background, rect, rect)
+            draw()
+            dirty.append(rect)
+        self.screen.set_clip(None)
+        return dirty
+
+    def save_replay(self, path: str = REPLAY_PATH):
+        """Enregistre le journal de la partie (cf. replay.py)."""
+        log = self.state.log
+        if log is None:
+            return
+        log.close(self.state.state_hash())
+        try:
+            log.save(path)
+        except OSError as e:
+            print(f"[WARN] journal non enregistré ({path}) : {e}")
+
+    def quick_save(self, path: str = SAVE_PATH):
+        try:
+            savegame.save(self.state, path)
+            self.push_event("Partie sauvegardée")
+        except (OSError, struct.error) as e:
+            self.push_event(f"Sauvegarde impossible : {e}")
+
+    def quick_load(self, path: str = SAVE_PATH):
+        try:
+            state = savegame.load(path)
+        except (OSError, ValueError) as e:
+            self.push_event(f"Chargement impossible : {e}")
+            return
+        # la partie reprise repart d'un historique vide, et d'un journal neuf
+        # qui part de l'état chargé (rejouable avec replay.py)
+        state.history = History(UNDO_LIMIT)
+        state.log = ActionLog(state.rng.seed, UNDO_LIMIT, start=savegame.dumps(state))
+        self.state = state
+        if self.draw_ui.active:
+            self.draw_ui.open()
+        self.push_event("Partie chargée")
+
+    def quit(self):
+        self.save_replay()
+        pygame.quit()
+        sys.exit()
 
     def run(self):
         while True:
             self.handle_events()
-            self.screen.fill(BG)
-            self.draw_grid()
-            if self.draw_ui.active:
-                self.draw_ui.draw(self.screen)
-            pygame.display.flip()
+            dirty = self.render_dirty()
+            if dirty:
+                pygame.display.update(dirty)
             self.clock.tick(FPS)
 
     def push_event(self, msg: str, ttl: int = 240):
@@ -684,4 +776,4 @@ class Game:
 
 
 if __name__ == "__main__":
-    Game().run()
+    Game(sys.argv[1] if len(sys.argv) > 1 else None).run()
@@ -1,12 +1,15 @@
-import random
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Union
 
-from rooms.room_data import RoomDef, ROOM_CATALOGUE
+from board import Board, GridView, NEIGHBORS, cell_index
+from constants import GRID_ROWS, GRID_COLS
+from deck import Deck
+from rng import GameRng
+from rooms.catalogue import BY_NAME, CATALOGUE, CompiledRoom
+from rooms.room_data import mask_to_doors
+import zobrist
 
 # ------------------ CONSTANTES ------------------
-GRID_ROWS = 9      # 9 lignes
-GRID_COLS = 5      # 5 colonnes
 
 # (r, c) = (ligne, colonne)
 START_POS = (GRID_ROWS - 1, GRID_COLS // 2)  # bas milieu -> (8, 2)
@@ -38,74 +41,260 @@ def inside(r: int, c: int) -> bool:
     return 0 <= r < GRID_ROWS and 0 <= c < GRID_COLS
 
 
-@dataclass
 class Room:
     """
-    Wrapper autour de RoomDef :
-    - definition : RoomDef
-    - placed_doors : tuple(bool,bool,bool,bool)
+    Pièce posée, en poids mouche : un seul entier
+        index de la salle dans CATALOGUE << 7 | fouillée << 6 | orientation << 4 | portes
+    - definition : CompiledRoom (relue dans CATALOGUE)
+    - placed_doors : masque 4 bits (bit i = porte DOOR_INDEX i)
     - orientation : 0..3 (multiples de 90°)
+    - looted : déjà fouillée
     """
-    definition: RoomDef
-    placed_doors: Tuple[bool, bool, bool, bool]
-    orientation: int = 0
-    looted: bool = False
+    __slots__ = ("bits",)
+
+    def __init__(self, definition: CompiledRoom, placed_doors: int, orientation: int = 0, looted: bool = False):
+        self.bits = definition.index << 7 | bool(looted) << 6 | (orientation & 3) << 4 | placed_doors & 0xF
+
+    @classmethod
+    def from_bits(cls, bits: int) -> "Room":
+        room = cls.__new__(cls)
+        room.bits = bits
+        return room
+
+    @property
+    def index(self) -> int:
+        """Index de la salle dans CATALOGUE."""
+        return self.bits >> 7
+
+    @property
+    def definition(self) -> CompiledRoom:
+        return CATALOGUE[self.bits >> 7]
+
+    @property
+    def placed_doors(self) -> int:
+        return self.bits & 0xF
+
+    @property
+    def orientation(self) -> int:
+        return self.bits >> 4 & 3
+
+    @property
+    def looted(self) -> bool:
+        return bool(self.bits & 0x40)
+
+    @looted.setter
+    def looted(self, value: bool) -> None:
+        self.bits = self.bits | 0x40 if value else self.bits & ~0x40
+
+    def has_door(self, idx: int) -> bool:
+        return bool(self.bits & (1 << idx))
+
+    @property
+    def doors(self) -> Tuple[bool, bool, bool, bool]:
+        """Portes posées sous forme (up, right, down, left)."""
+        return mask_to_doors(self.bits & 0xF)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Room):
+            return NotImplemented
+        return self.bits == other.bits
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"Room({self.definition.name!r}, placed_doors={self.placed_doors:#06b}, "
+                f"orientation={self.orientation}, looted={self.looted})")
+
+@dataclass
+class Candidate:
+    """
+    Résultat d'un tirage pour une case donnée :
+    - room : CompiledRoom tirée
+    - options : rotations légales (orientation, masque de portes)
+    - gem_cost : coût effectif en gemmes
+    """
+    room: CompiledRoom
+    options: List[Tuple[int, int]]
+    gem_cost: int
+
+    @property
+    def door_options(self) -> List[Tuple[int, Tuple[bool, bool, bool, bool]]]:
+        """Rotations légales avec portes sous forme (up, right, down, left)."""
+        return [(orientation, mask_to_doors(mask)) for orientation, mask in self.options]
+
+    def doors_for(self, orientation: int) -> Optional[int]:
+        """Masque de portes pour cette orientation, ou None si elle est illégale."""
+        for option, mask in self.options:
+            if option == orientation:
+                return mask
+        return None
+
 
 class Manor:
     """
     Gère la grille 9x5, la pioche et les règles de placement.
-    grid[r][c] contient soit None soit un Room.
+    board : plateau à plat (bitboards), grid[r][c] : vue sur board
+    contenant soit None soit un Room.
+    rng : flux aléatoires de la partie (pioche, verrous, tirage, rotations).
     """
 
-    def __init__(self):
+    def __init__(self, rng: Optional[GameRng] = None):
+        self.rng = rng if rng is not None else GameRng()
+        self.board = Board()
         # grid[r][c]
-        self.grid: List[List[Optional[Room]]] = [
-            [None for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)
-        ]
+        self.grid = GridView(self.board)
 
         self.start: Tuple[int, int] = START_POS  # (row, col)
         self.goal: Tuple[int, int] = GOAL_POS
 
-        self.deck: List[RoomDef] = []
+        self.deck = Deck()
+        # (case, côté d'entrée) -> {index de seau valide: rotations (orientation, masque)}
+        self._candidate_cache: Dict[Tuple[int, int], Dict[int, List[Tuple[int, int]]]] = {}
         self._build_deck()
         self._place_fixed_rooms()
 
+        # hash de Zobrist (grille + pioche), tenu à jour par place_room / note_looted
+        self.zhash = self.compute_hash()
+
+    @classmethod
+    def assemble(cls, rng: GameRng, deck: Deck, rooms) -> "Manor":
+        """
+        Manoir reconstruit sans aucun tirage (chargement d'une sauvegarde) :
+        pioche telle quelle et pièces [(case, Room)] déjà posées.
+        """
+        self = cls.__new__(cls)
+        self.rng = rng
+        self.board = Board()
+        self.grid = GridView(self.board)
+        self.start = START_POS
+        self.goal = GOAL_POS
+        self.deck = deck
+        self._candidate_cache = {}
+        for idx, room in rooms:
+            self.board.set(idx, room)
+        self.zhash = self.compute_hash()
+        return self
+
     # ------------------ INIT DECK + SALLES FIXES ------------------
 
     def _build_deck(self) -> None:
         """Pioche de toutes les salles sauf Entrance / Antechamber."""
-        self.deck.clear()
-        for rd in ROOM_CATALOGUE:
-            if rd.name in ("Entrance Hall", "Antechamber"):
-                continue
-            self.deck.append(rd)
-        random.shuffle(self.deck)
+        rooms = [
+            rd for rd in CATALOGUE
+            if rd.name not in ("Entrance Hall", "Antechamber")
+        ]
+        self.rng.deck.shuffle(rooms)
+        self.deck = Deck(rooms)
+        self._candidate_cache.clear()
 
     def _place_fixed_rooms(self) -> None:
         """Place Entrance Hall en bas milieu et Antechamber en haut milieu."""
-        entrance_hall = next((r for r in ROOM_CATALOGUE if r.name == "Entrance Hall"), None)
-        antechamber   = next((r for r in ROOM_CATALOGUE if r.name == "Antechamber"), None)
+        entrance_hall = BY_NAME.get("Entrance Hall")
+        antechamber   = BY_NAME.get("Antechamber")
 
         if entrance_hall is None:
-            print("ERROR: 'Entrance Hall' not found in ROOM_CATALOGUE")
+            print("ERROR: 'Entrance Hall' not found in CATALOGUE")
         else:
             r, c = START_POS
-            self.grid[r][c] = Room(entrance_hall, entrance_hall.doors, orientation=0)
+            self.grid[r][c] = Room(entrance_hall, entrance_hall.door_mask, orientation=0)
 
         if antechamber is None:
-            print("ERROR: 'Antechamber' not found in ROOM_CATALOGUE")
+            print("ERROR: 'Antechamber' not found in CATALOGUE")
         else:
             r, c = GOAL_POS
-            self.grid[r][c] = Room(antechamber, antechamber.doors, orientation=0)
+            self.grid[r][c] = Room(antechamber, antechamber.door_mask, orientation=0)
+
+    # ------------------ HASH DE ZOBRIST ------------------
+
+    def compute_hash(self) -> int:
+        """Hash complet recalculé (l'incrémental self.zhash doit lui être égal)."""
+        h = 0
+        for idx, room in enumerate(self.board.rooms):
+            if room is None:
+                continue
+            h ^= zobrist.cell_key(idx, room.index, room.orientation)
+            if room.looted:
+                h ^= zobrist.LOOTED_KEYS[idx]
+        for rd in self.deck:
+            h ^= zobrist.DECK_KEYS[rd.index]
+        return h
+
+    def note_looted(self, r: int, c: int) -> None:
+        """La pièce (r, c) vient d'être fouillée (looted passé à True) : met le hash à jour."""
+        self.zhash ^= zobrist.LOOTED_KEYS[cell_index(r, c)]
+
+    # ------------------ CLONE / SNAPSHOT ------------------
+
+    def clone(self, rng: Optional[GameRng] = None) -> "Manor":
+        """
+        Copie indépendante en O(1) pour la recherche : plateau et pioche en
+        copie sur écriture, catalogue partagé, cache de candidats repris tel quel.
+        rng : flux du clone (par défaut dérivés de ceux de self, cf. GameRng.fork).
+        """
+        other = Manor.__new__(Manor)
+        other.rng = rng if rng is not None else self.rng.fork()
+        other._restore_from(self)
+        return other
+
+    def snapshot(self) -> "Manor":
+        """
+        État figé, restaurable autant de fois que voulu (cf. restore). Les
+        flux sont recopiés, pas dérivés : prendre un snapshot ne change pas
+        l'état aléatoire de la partie.
+        """
+        return self.clone(self.rng.clone())
+
+    def restore(self, snapshot: "Manor") -> None:
+        """
+        Revient à l'état d'un snapshot (qui reste intact et réutilisable).
+        Les flux aléatoires ne sont pas touchés (cf. GameState.restore).
+        """
+        self._restore_from(snapshot)
+
+    def _restore_from(self, source: "Manor") -> None:
+        self.board = source.board.clone()
+        self.grid = GridView(self.board)
+        self.start = source.start
+        self.goal = source.goal
+        self.deck = source.deck.clone()
+        # les entrées du cache sont remplacées, jamais modifiées : copie superficielle
+        self._candidate_cache = dict(source._candidate_cache)
+        self.zhash = source.zhash
+
+    def replay_cells(self, cells, drawn, put_back: bool, zhash: int) -> None:
+        """
+        Annuler / rétablir (cf. history.Delta) : pose telles quelles les pièces
+        `cells` [(case, pièce)], remet (put_back) ou retire de la pioche les
+        salles `drawn`, puis reprend le hash `zhash`.
+        """
+        for idx, room in cells:
+            self.board.set(idx, room)
+            self._invalidate_around(idx)
+        for rd in drawn:
+            if put_back:
+                bucket = self.deck.bucket_of(rd)
+                self.deck.put_back(rd)
+                if bucket is None and self.deck.bucket_of(rd).count == 1:
+                    # seau de nouveau non vide : absent des entrées du cache
+                    self._candidate_cache.clear()
+            else:
+                self.deck.remove(rd)
+        # ces pièces sont aussi référencées par l'historique
+        self.board.disown()
+        self.zhash = zhash
 
     # ------------------ ACCÈS SIMPLES ------------------
 
     def get_room(self, c: int, r: int) -> Optional[Room]:
         """Compat éventuelle avec ancien code (x = col, y = row)."""
         if inside(r, c):
-            return self.grid[r][c]
+            return self.board.get(cell_index(r, c))
         return None
 
+    def mutable_room(self, r: int, c: int) -> Optional[Room]:
+        """Pièce (r, c) modifiable sans toucher aux clones qui la partagent."""
+        return self.board.mutable_room(cell_index(r, c))
+
     # ------------------ NIVEAU DE VERROU ------------------
 
     def lock_level_for_row(self, r: int) -> int:
@@ -114,172 +303,178 @@ class Manor:
             return 0
         if r == GOAL_POS[0]:
             return 2
-        return random.choice([0, 1, 1, 1, 2])
-
-    # ------------------ AIDE RARETÉ / COÛT ------------------
-
-    def _get_rarity_weight(self, room: RoomDef) -> float:
-        rarity = room.rarity
-        if isinstance(rarity, tuple):
-            rarity = rarity[0]
-        return 1.0 / (3 ** rarity)
-
-    def _get_gem_cost(self, room: RoomDef) -> int:
-        cost = room.gem_cost
-        if isinstance(cost, tuple):
-            cost = cost[0]
-        return cost
-
-    # ------------------ CONTRÔLE DE PLACEMENT ------------------
-    def _is_valid_placement(self, room: RoomDef, r: int, c: int, from_dir: str) -> bool:
-        # 0) contraintes de bordure spéciales du room_def
-        cond = getattr(room, "placement_condition", None)
-        if cond == "border_only":
-            if not (r == 0 or r == GRID_ROWS - 1 or c == 0 or c == GRID_COLS - 1):
-                return False
-        if cond == "not_edges":
-            if r == 0 or r == GRID_ROWS - 1 or c == 0 or c == GRID_COLS - 1:
-                return False
-
-        # direction par laquelle on ENTRE dans la nouvelle pièce
-        # from_dir = direction où on se déplace depuis l’ancienne pièce
-        entry_dir_name = OPPOSITE_DIR[from_dir]               # côté de la nouvelle pièce
-        entry_dir_idx = DOOR_INDEX[entry_dir_name]            # 0/1/2/3
+        return self.rng.locks.choice([0, 1, 1, 1, 2])
 
-        # y a-t-il au moins une rotation possible ?
-        options = self._valid_rotations_for(room, r, c, entry_dir_idx)
-        return bool(options)
+    # ------------------ TIRAGE DES CANDIDATS ------------------
 
+    def _valid_buckets(self, r: int, c: int, entry_dir_idx: int) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Index des seaux de la pioche posables en (r, c) par le côté
+        entry_dir_idx, avec leurs rotations valides. Mis en cache par (case, côté d'entrée) :
+        ne change que lorsqu'une case voisine est posée (cf. _invalidate_around).
+        Les retraits de la pioche ne font que baisser les poids vivants des seaux.
+        """
+        idx = cell_index(r, c)
+        key = (idx, entry_dir_idx)
+        cached = self._candidate_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # contraintes de la case calculées une seule fois pour toute la pioche
+        known, required = self._cell_constraints(r, c, entry_dir_idx)
+
+        # un seul test par seau de l'index (même forme, même condition)
+        valid: Dict[int, List[Tuple[int, int]]] = {}
+        for bucket in self.deck.buckets():
+            _shape, allowed_cells, _free = bucket.key
+            if not allowed_cells[entry_dir_idx] >> idx & 1:
+                continue
+            sample_room = self.deck.rooms[bucket.slots[0]]
+            options = self._rotations_matching(sample_room, known, required)
+            if options:
+                valid[bucket.index] = options
+
+        self._candidate_cache[key] = valid
+        return valid
+
+    def _invalidate_around(self, idx: int) -> None:
+        """Oublie le cache des cases idx et de ses 4 voisines."""
+        for cell in (idx,) + NEIGHBORS[idx]:
+            if cell < 0:
+                continue
+            for entry_dir_idx in range(4):
+                self._candidate_cache.pop((cell, entry_dir_idx), None)
 
-    # ------------------ TIRAGE DES CANDIDATS ------------------
+    def cached_rotations(self, room_def: CompiledRoom, r: int, c: int, entry_dir_idx: int):
+        """Comme _valid_rotations_for, mais lu dans le cache si room_def est en pioche."""
+        bucket = self.deck.bucket_of(room_def)
+        if bucket is None:
+            return self._valid_rotations_for(room_def, r, c, entry_dir_idx)
+        return self._valid_buckets(r, c, entry_dir_idx).get(bucket.index, [])
 
-    def draw_candidates(self, r: int, c: int, from_dir: str) -> List[RoomDef]:
-        """Renvoie 3 RoomDef possibles pour (r, c) en venant de from_dir."""
-        valid = [
-            rd for rd in self.deck
-            if self._is_valid_placement(rd, r, c, from_dir)
-        ]
+    def draw_candidates(self, r: int, c: int, from_dir: str) -> List[Candidate]:
+        """
+        Renvoie 3 candidats possibles pour (r, c) en venant de from_dir,
+        chacun avec ses rotations légales : inutile de les recalculer ensuite.
+        """
+        entry_dir_idx = DOOR_INDEX[OPPOSITE_DIR[from_dir]]
+        buckets = self._valid_buckets(r, c, entry_dir_idx)
+        valid = [self.deck.bucket(i) for i in buckets]
+        valid = [bucket for bucket in valid if bucket.count]
         if not valid:
             return []
 
-        weights = [self._get_rarity_weight(rd) for rd in valid]
-
-        if len(valid) <= 3:
-            candidates = valid[:]
+        if sum(bucket.count for bucket in valid) <= 3:
+            candidates = [rd for bucket in valid for rd in self.deck.rooms_in(bucket)]
         else:
-            candidates = random.choices(valid, weights=weights, k=3)
+            # tirage pondéré par rareté, restreint aux seaux valides
+            candidates = self.deck.sample(valid, 3, self.rng.draft)
 
         # garantir au moins 1 salle coût 0
-        if all(self._get_gem_cost(x) > 0 for x in candidates):
-            free = [rd for rd in valid if self._get_gem_cost(rd) == 0]
+        if all(x.gem_cost > 0 for x in candidates):
+            free = [bucket for bucket in valid if bucket.free]
             if free:
-                import random as _r
-                candidates[_r.randint(0, len(candidates) - 1)] = _r.choice(free)
+                slot = self.rng.draft.randint(0, len(candidates) - 1)
+                candidates[slot] = self.deck.pick_uniform(free, self.rng.draft)
 
-        return candidates
+        return [
+            Candidate(rd, buckets[self.deck.bucket_of(rd).index], rd.gem_cost)
+            for rd in candidates
+        ]
 
     # ------------------ PLACEMENT EFFECTIF ------------------
 
     def place_room(
         self,
-        room_def: RoomDef,
+        room: Union[CompiledRoom, Candidate],
         r: int,
         c: int,
         from_dir: str,
         orientation: Optional[int] = None,
-        doors: Optional[Tuple[bool, bool, bool, bool]] = None,
-    ) -> None:
+        doors: Optional[int] = None,
+    ) -> bool:
+        """
+        Pose une salle en (r, c). Avec un Candidate, l'orientation choisie est
+        vérifiée contre ses rotations légales (refusée sinon) sans recalcul.
+        Renvoie True si la salle a été posée.
+        """
         if not inside(r, c):
-            return
-
-        # calculer la direction d’entrée côté nouvelle pièce
-        entry_dir_name = OPPOSITE_DIR[from_dir]
-        entry_dir_idx = DOOR_INDEX[entry_dir_name]
+            return False
+
+        if isinstance(room, Candidate):
+            room_def = room.room
+            options = room.options
+            if orientation is not None:
+                doors = room.doors_for(orientation)
+                if doors is None:
+                    return False
+        else:
+            room_def = room
+            options = None
 
         # si aucune orientation/portes n’est imposée, on choisit ici
         if orientation is None or doors is None:
-            options = self._valid_rotations_for(room_def, r, c, entry_dir_idx)
+            if options is None:
+                # calculer la direction d’entrée côté nouvelle pièce
+                entry_dir_idx = DOOR_INDEX[OPPOSITE_DIR[from_dir]]
+                options = self.cached_rotations(room_def, r, c, entry_dir_idx)
             if not options:
-                return
-            import random
-            orientation, doors = random.choice(options)
-
-        # créer la Room avec les portes finales + orientation
-        self.grid[r][c] = Room(room_def, tuple(doors), orientation=orientation)
+                return False
+            orientation, doors = self.rng.rotations.choice(options)
+
+        # créer la Room avec les portes finales (masque) + orientation
+        idx = cell_index(r, c)
+        previous = self.board.get(idx)
+        if previous is not None:
+            self.zhash ^= zobrist.cell_key(idx, previous.index, previous.orientation)
+            if previous.looted:
+                self.zhash ^= zobrist.LOOTED_KEYS[idx]
+        self.board.set(idx, Room(room_def, doors, orientation=orientation))
+        self._invalidate_around(idx)
+        self.zhash ^= zobrist.cell_key(idx, room_def.index, orientation)
 
         # retirer de la pioche
-        if room_def in self.deck:
-            self.deck.remove(room_def)
-
+        if self.deck.remove(room_def):
+            self.zhash ^= zobrist.DECK_KEYS[room_def.index]
+        return True
 
+    # ------------------ ROTATIONS (MASQUES DE PORTES) ------------------
 
-    # ------------------ ROTATION HELPER ------------------
-    def _rotate_doors(self, doors, orientation: int):
+    def _cell_constraints(self, r: int, c: int, entry_dir_idx: int) -> Tuple[int, int]:
+        """
+        Résume la case (r, c) en deux masques 4 bits :
+        - known : côtés déjà décidés (bord du manoir ou voisin posé)
+        - required : parmi ces côtés, ceux qui doivent avoir une porte
+        Une rotation `mask` est compatible ssi (mask & known) == required.
         """
-        doors = [up, right, down, left]
-        orientation: 0,1,2,3 -> 0°, 90°, 180°, 270° (clockwise)
-        """ 
-        steps = orientation % 4
-        if steps == 0:
-            return list(doors)
-        return doors[-steps:] + doors[:-steps]
-
-    def _valid_rotations_for(self, room_def: RoomDef, r: int, c: int, entry_dir_idx: int):
+        # bords du manoir + voisins déjà placés, lus dans les bitboards
+        known, required = self.board.constraints(cell_index(r, c))
+
+        # il faut une porte côté entrée
+        entry_bit = 1 << entry_dir_idx
+        if known & entry_bit and not required & entry_bit:
+            # entrée contre un mur ou un voisin sans porte : aucune rotation possible
+            return 0, 1
+        return known | entry_bit, required | entry_bit
+
+    def _rotations_matching(self, room_def: CompiledRoom, known: int, required: int):
+        """Rotations (orientation, masque) de room_def compatibles avec known/required."""
+        # éviter que la pièce soit un cul-de-sac (une seule porte)
+        # sauf si c'est la salle objectif
+        if room_def.door_count <= 1 and not room_def.dead_end_ok:
+            return []
+        return [
+            (orientation, mask)
+            for orientation, mask in room_def.rotations
+            if mask & known == required
+        ]
+
+    def _valid_rotations_for(self, room_def: CompiledRoom, r: int, c: int, entry_dir_idx: int):
         """
         Retourne une liste de (orientation, doors) valides pour placer room_def
         à la position (r, c), en entrant par la direction entry_dir_idx
         (0=up,1=right,2=down,3=left côté NOUVELLE pièce).
+        doors est un masque 4 bits ; les rotations symétriques sont dédoublonnées.
         """
-        valid = []
-
-        for orientation in range(4):
-            doors = self._rotate_doors(room_def.doors, orientation)
-
-            # 1) il faut une porte côté entrée
-            if not doors[entry_dir_idx]:
-                continue
-
-            # 2) portes ne doivent pas sortir du manoir
-            if doors[0] and r == 0:               # up
-                continue
-            if doors[2] and r == GRID_ROWS - 1:   # down
-                continue
-            if doors[3] and c == 0:               # left
-                continue
-            if doors[1] and c == GRID_COLS - 1:   # right
-                continue
-
-            # 3) compatibilité avec voisins déjà placés
-            ok = True
-            # voisin du haut
-            if r > 0 and self.grid[r - 1][c] is not None:
-                up_room = self.grid[r - 1][c]
-                if doors[0] != up_room.placed_doors[2]:
-                    ok = False
-            # voisin de droite
-            if ok and c < GRID_COLS - 1 and self.grid[r][c + 1] is not None:
-                right_room = self.grid[r][c + 1]
-                if doors[1] != right_room.placed_doors[3]:
-                    ok = False
-            # voisin du bas
-            if ok and r < GRID_ROWS - 1 and self.grid[r + 1][c] is not None:
-                down_room = self.grid[r + 1][c]
-                if doors[2] != down_room.placed_doors[0]:
-                    ok = False
-            # voisin de gauche
-            if ok and c > 0 and self.grid[r][c - 1] is not None:
-                left_room = self.grid[r][c - 1]
-                if doors[3] != left_room.placed_doors[1]:
-                    ok = False
-            
-            if not ok:
-                continue
-
-            # 4) éviter que la pièce soit un cul-de-sac (une seule porte)
-            # sauf si c'est la salle objectif
-            if sum(doors) <= 1 and room_def.name != "Antechamber":
-                continue
-
-            valid.append((orientation, doors))
-
-        return valid
\ No newline at end of file
+        known, required = self._cell_constraints(r, c, entry_dir_idx)
+        return self._rotations_matching(room_def, known, required)
@@ -1,7 +1,23 @@
 # player.py
 from inventory.inventory import Inventory
+import zobrist
+
+# tables de clés de Zobrist par attribut suivi
+_ZKEYS = {"r": zobrist.ROW_KEYS, "c": zobrist.COL_KEYS, "dir": zobrist.DIR_KEYS}
+
 
 class Player:
+    def __setattr__(self, name, value):
+        # hash de Zobrist de la position/direction tenu à jour à chaque changement
+        keys = _ZKEYS.get(name)
+        if keys is not None:
+            d = self.__dict__
+            h = d.get("zhash", 0) ^ keys[value]
+            if name in d:
+                h ^= keys[d[name]]
+            d["zhash"] = h
+        object.__setattr__(self, name, value)
+
     def __init__(self, r=3, c=1, inventory: Inventory | None = None):
         # position sur la grille (ligne, colonne)
         self.r = r
@@ -11,6 +27,21 @@ class Player:
         # on ne crée pas un nouvel inventaire si on nous en fournit un
         self.inventory = inventory if inventory is not None else Inventory()
 
+    def snapshot(self):
+        return self.r, self.c, self.dir, self.zhash
+
+    def restore(self, snapshot):
+        d = self.__dict__
+        d["r"], d["c"], d["dir"], d["zhash"] = snapshot
+
+    def clone(self, inventory: Inventory | None = None):
+        """Copie du joueur, rattachée à inventory (par défaut le même inventaire)."""
+        other = Player.__new__(Player)
+        other.__dict__.update(self.__dict__)
+        if inventory is not None:
+            other.__dict__["inventory"] = inventory
+        return other
+
     def move(self, dr, dc):
         self.r += dr
         self.c += dc
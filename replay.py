@@ -0,0 +1,145 @@
+"""
+Rejeu d'une partie enregistrée (actionlog.ActionLog), sans affichage.
+
+Replayer réexécute le journal sur un GameState neuf de même graine (ou sur
+l'état de départ du journal, pour une partie reprise d'une sauvegarde) et garde
+un snapshot tous les `interval` coups : seek(n) repart du snapshot le plus
+proche au lieu du début. À la fin, le hash de l'état est comparé à celui
+noté dans le journal.
+
+Exemple :
+    python replay.py last_game.bplg --seek 500 --render final.png
+"""
+
+import argparse
+import bisect
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import savegame
+from actionlog import ActionLog
+from engine import GameState
+from history import History
+
+
+class ReplayError(ValueError):
+    """Le rejeu ne retrouve pas l'état final enregistré."""
+
+
+def initial_state(log: ActionLog) -> GameState:
+    """État sur lequel rejouer le journal."""
+    if log.start is None:
+        return GameState(seed=log.seed, history=log.history or None)
+    state = savegame.loads(log.start)
+    state.history = History(log.history) if log.history else None
+    return state
+
+
+class Replayer:
+    """Rejeu pas à pas d'un journal, avec snapshots périodiques pour seek."""
+
+    def __init__(self, log: ActionLog, interval: int = 100):
+        if interval <= 0:
+            raise ValueError("interval doit être > 0")
+        self.log = log
+        self.interval = interval
+        self.state = initial_state(log)
+        self.position = 0
+        # coup -> snapshot de l'état avant ce coup (clés triées dans _marks)
+        self._checkpoints: Dict[int, Tuple] = {0: self.state.snapshot()}
+        self._marks: List[int] = [0]
+
+    def __len__(self) -> int:
+        return len(self.log)
+
+    def step(self) -> bool:
+        """Joue le coup suivant. False à la fin du journal."""
+        if self.position >= len(self.log):
+            return False
+        self.state.apply(self.log[self.position])
+        self.position += 1
+        if self.position % self.interval == 0 and self.position not in self._checkpoints:
+            self._checkpoints[self.position] = self.state.snapshot()
+            bisect.insort(self._marks, self.position)
+        return True
+
+    def seek(self, n: int) -> GameState:
+        """État après les n premiers coups (depuis le snapshot le plus proche)."""
+        n = max(0, min(n, len(self.log)))
+        mark = self._marks[bisect.bisect_right(self._marks, n) - 1]
+        if not mark <= self.position <= n:
+            self.state.restore(self._checkpoints[mark])
+            self.position = mark
+        while self.position < n:
+            self.step()
+        return self.state
+
+    def run(self, verify: bool = True) -> GameState:
+        """Rejoue jusqu'au bout ; vérifie le hash final s'il est connu."""
+        self.seek(len(self.log))
+        if verify:
+            self.verify()
+        return self.state
+
+    def verify(self) -> None:
+        expected = self.log.final_hash
+        if expected is None or self.position != len(self.log):
+            return
+        got = self.state.state_hash()
+        if got != expected:
+            raise ReplayError(f"hash final {got:#018x} au lieu de {expected:#018x}")
+
+
+def replay(log: ActionLog, verify: bool = True) -> GameState:
+    """Rejoue tout le journal d'un coup, sans snapshots."""
+    return Replayer(log, interval=len(log) + 1).run(verify)
+
+
+def render_final(state: GameState, path: str) -> None:
+    """Dessine l'état (une seule image, sans fenêtre) dans un fichier image."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from main_game import Game
+
+    game = Game()
+    game.state = state
+    game.render()
+    pygame.image.save(game.screen, path)
+    pygame.quit()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rejeu d'une partie enregistrée.")
+    parser.add_argument("log", help="journal (.bplg)")
+    parser.add_argument("--seek", type=int, default=None, help="s'arrêter après N coups")
+    parser.add_argument("--interval", type=int, default=100, help="coups entre deux snapshots")
+    parser.add_argument("--render", default=None, help="image de l'état atteint (png)")
+    args = parser.parse_args(argv)
+
+    log = ActionLog.load(args.log)
+    replayer = Replayer(log, args.interval)
+    start = time.perf_counter()
+    try:
+        if args.seek is None:
+            state = replayer.run()
+        else:
+            state = replayer.seek(args.seek)
+    except ReplayError as e:
+        print(f"Rejeu divergent : {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Graine : {log.seed}")
+    print(f"Coups rejoués : {replayer.position}/{len(log)} en {elapsed:.3f} s")
+    print(f"Hash : {state.state_hash():#018x}")
+    if state.game_over:
+        print(state.game_over)
+    if args.render:
+        render_final(state, args.render)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Aléa d'une partie : un flux random.Random indépendant par sous-système.
+
+Tous les flux dérivent d'une seule graine ; une partie rejouée avec la
+même graine et les mêmes actions est identique. Chaque flux n'est tiré
+que par son sous-système : changer la façon de fouiller une pièce ne
+décale pas les tirages de la pioche, etc.
+
+Les graines sont des str (hachées en SHA-512 par random.seed) : spawn_seed
+donne à chaque partie / processus d'un lot des flux indépendants, sans
+dépendre du nombre de processus ni de l'ordre d'exécution. Un flux n'est
+créé qu'à sa première utilisation : fork() (clones de recherche) reste
+bon marché.
+"""
+
+import random
+from typing import Dict, Optional, Tuple, Union
+
+# sous-systèmes tirant au hasard
+STREAMS = (
+    "deck",       # mélange de la pioche (Manor._build_deck)
+    "locks",      # niveau de verrou des portes (Manor.lock_level_for_row)
+    "draft",      # tirage des candidats (Manor.draw_candidates, Deck.sample)
+    "rotations",  # orientation retenue pour un candidat (Draft, Manor.place_room)
+    "loot",       # quantités d'objets trouvés (loot_room)
+    "effects",    # valeurs aléatoires des effets de pièces (apply_room_effect)
+)
+
+Seed = Union[int, str]
+
+
+class GameRng:
+    """Flux nommés d'une partie : rng.deck, rng.locks, rng.draft..."""
+
+    __slots__ = ("seed", "_forks") + STREAMS
+
+    def __init__(self, seed: Optional[Seed] = None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self._forks = 0
+
+    def __getattr__(self, name: str) -> random.Random:
+        # flux pas encore créé (slot vide)
+        if name not in STREAMS:
+            raise AttributeError(name)
+        stream = random.Random(f"{self.seed}:{name}")
+        setattr(self, name, stream)
+        return stream
+
+    def fork(self) -> "GameRng":
+        """Nouveaux flux dérivés, différents à chaque appel mais reproductibles."""
+        self._forks += 1
+        return GameRng(f"{self.seed}#{self._forks}")
+
+    # ------------------ ÉTAT ------------------
+
+    @property
+    def forks(self) -> int:
+        """Nombre de fork() déjà faits (le prochain clone en dépend)."""
+        return self._forks
+
+    @forks.setter
+    def forks(self, value: int) -> None:
+        self._forks = value
+
+    def _created(self) -> Dict[str, random.Random]:
+        """Flux déjà créés (lecture des slots sans passer par __getattr__)."""
+        created = {}
+        for name in STREAMS:
+            try:
+                created[name] = _SLOTS[name].__get__(self)
+            except AttributeError:
+                pass
+        return created
+
+    def getstate(self) -> Dict[str, Tuple]:
+        """État des flux déjà utilisés (les autres repartiront de leur graine)."""
+        return {name: stream.getstate() for name, stream in self._created().items()}
+
+    def setstate(self, state: Dict[str, Tuple]) -> None:
+        created = self._created()
+        for name in STREAMS:
+            if name in state:
+                stream = created.get(name)
+                if stream is None:
+                    # Random() se graine sur os.urandom : graine fixe, écrasée aussitôt
+                    stream = random.Random(0)
+                    setattr(self, name, stream)
+                stream.setstate(state[name])
+            elif name in created:
+                delattr(self, name)
+
+    def clone(self) -> "GameRng":
+        """Copie qui tirera exactement la même suite, indépendamment de l'original."""
+        other = GameRng(self.seed)
+        other._forks = self._forks
+        other.setstate(self.getstate())
+        return other
+
+
+# descripteurs des slots de flux
+_SLOTS = {name: GameRng.__dict__[name] for name in STREAMS}
+
+
+def spawn_seed(seed: Seed, index: int) -> str:
+    """Graine dérivée n°index de seed (une partie ou un processus d'un lot)."""
+    return f"{seed}/{index}"
@@ -0,0 +1,231 @@
+"""
+Compiled room catalogue.
+
+`room_data.ROOM_CATALOGUE` is the hand-written source: rarity and gem cost
+may be an int or a (min, max) tuple, effect values too, placement
+conditions are free text (see rooms.placement), effects are named by a
+string (see rooms.effects) and loot is a dict of object names (see
+rooms.loot). `compile_catalogue` validates
+and normalises every entry once into an immutable, slotted `CompiledRoom`
+whose position in `CATALOGUE` is its `index`. The game, the deck and the
+simulators only ever read these compiled records.
+
+The compiled tuple is cached on disk (rooms/__pycache__), keyed by a hash
+of room_data.py, of the compiler sources (this module, placement.py,
+effects.py and loot.py) and of COMPILER_VERSION.
+
+Problems that do not stop compilation (a placement word the rule language
+does not know...) are kept in ISSUES, by kind, and reported as a
+CatalogueWarning every time the catalogue is loaded, cached or not.
+"""
+
+import hashlib
+import os
+import pickle
+import warnings
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rooms import effects, loot, placement, room_data
+from rooms.effects import PASSIVE, Effect, compile_effect
+from rooms.loot import LootItem, compile_loot
+from rooms.placement import PlacementRule, compile_rule, parse_rule
+from rooms.room_data import RoomDef, distinct_rotations, doors_to_mask
+
+COMPILER_VERSION = 4
+
+# The goal room may be a dead end (see Manor._rotations_matching)
+DEAD_END_ROOMS = ("Antechamber",)
+
+_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+
+
+class CatalogueError(ValueError):
+    """The source catalogue has an entry that cannot be compiled."""
+
+
+class CatalogueWarning(UserWarning):
+    """The source catalogue has entries that are only partly used."""
+
+
+# kinds of tolerated problems (keys of ISSUES)
+PLACEMENT = "placement"
+EFFECT = "effect"
+LOOT = "loot"
+Issues = Dict[str, Tuple[str, ...]]
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CompiledRoom:
+    """
+    A validated, normalised room type. Every range is a (min, max) pair
+    of ints and every scalar is a plain int. Identity is the index:
+    equality and hashing never look at the other fields.
+    """
+    index: int
+    name: str
+    color: str
+    image_path: str
+
+    rarity: int
+    weight: int                        # 3 ** (top rarity - rarity), for weighted draws
+    gem_cost: int
+
+    door_mask: int
+    door_count: int
+    rotations: Tuple[Tuple[int, int], ...]
+    dead_end_ok: bool
+
+    placement: PlacementRule
+    placement_text: Optional[str]      # raw condition from the source
+    allowed_cells: Tuple[int, int, int, int]   # cell bitboards, by entry side
+
+    effect: Optional[Effect]
+    loot: Tuple[LootItem, ...]
+
+    @property
+    def free(self) -> bool:
+        return self.gem_cost == 0
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompiledRoom):
+            return NotImplemented
+        return self.index == other.index
+
+    def __hash__(self) -> int:
+        return self.index
+
+
+# -----------------------------------------------------------------
+# COMPILATION
+# -----------------------------------------------------------------
+
+def _scalar(rd: RoomDef, field_name: str) -> int:
+    """int or (min, max) tuple -> int (the minimum, as the game always used)."""
+    value = getattr(rd, field_name)
+    if isinstance(value, tuple):
+        value = _range(rd, field_name, value)[0]
+    if not isinstance(value, int) or value < 0:
+        raise CatalogueError(f"{rd.name}: invalid {field_name} ({value!r})")
+    return value
+
+
+def _range(rd: RoomDef, field_name: str, value) -> Tuple[int, int]:
+    """int or (min, max) tuple -> validated (min, max)."""
+    if isinstance(value, int):
+        value = (value, value)
+    if (not isinstance(value, tuple) or len(value) != 2
+            or not all(isinstance(v, int) for v in value) or not 0 <= value[0] <= value[1]):
+        raise CatalogueError(f"{rd.name}: invalid {field_name} ({value!r})")
+    return value
+
+
+def compile_room(index: int, rd: RoomDef, top_rarity: int, issues: Dict[str, List[str]]) -> CompiledRoom:
+    if not rd.name:
+        raise CatalogueError(f"room #{index} has no name")
+    door_mask = doors_to_mask(rd.doors)
+    if not door_mask:
+        raise CatalogueError(f"{rd.name}: no doors")
+
+    rarity = _scalar(rd, "rarity")
+    placement, problems = parse_rule(rd.placement_condition, rd.allowed_rows)
+    effect, effect_problems = compile_effect(rd.effect_id, rd.effect_value)
+    loot_items, loot_problems = compile_loot(rd.objects_in_room)
+    allowed_cells = compile_rule(placement)
+    if not any(allowed_cells):
+        problems.append("placement rule allows no cell")
+    for kind, found in ((PLACEMENT, problems), (EFFECT, effect_problems), (LOOT, loot_problems)):
+        issues[kind].extend(f"{rd.name}: {problem}" for problem in found)
+    return CompiledRoom(
+        index=index,
+        name=rd.name,
+        color=rd.color,
+        image_path=rd.image_path,
+        rarity=rarity,
+        weight=3 ** (top_rarity - rarity),
+        gem_cost=_scalar(rd, "gem_cost"),
+        door_mask=door_mask,
+        door_count=bin(door_mask).count("1"),
+        rotations=distinct_rotations(door_mask),
+        dead_end_ok=rd.name in DEAD_END_ROOMS,
+        placement=placement,
+        placement_text=rd.placement_condition,
+        allowed_cells=allowed_cells,
+        effect=effect,
+        loot=loot_items,
+    )
+
+
+def compile_catalogue(source: Sequence[RoomDef]) -> Tuple[Tuple[CompiledRoom, ...], Issues]:
+    """Compiles every RoomDef; returns (records, issues found but tolerated, by kind)."""
+    issues: Dict[str, List[str]] = {PLACEMENT: [], EFFECT: [], LOOT: []}
+    names = set()
+    for rd in source:
+        if rd.name in names:
+            raise CatalogueError(f"duplicate room: {rd.name}")
+        names.add(rd.name)
+    top = max((_scalar(rd, "rarity") for rd in source), default=0)
+    rooms = tuple(compile_room(i, rd, top, issues) for i, rd in enumerate(source))
+    return rooms, {kind: tuple(found) for kind, found in issues.items()}
+
+
+# -----------------------------------------------------------------
+# DISK CACHE
+# -----------------------------------------------------------------
+
+def source_key() -> str:
+    digest = hashlib.sha256(b"compiler=%d" % COMPILER_VERSION)
+    for module_file in (room_data.__file__, placement.__file__, effects.__file__, loot.__file__, __file__):
+        with open(module_file, "rb") as f:
+            digest.update(b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def load_catalogue() -> Tuple[Tuple[CompiledRoom, ...], Issues]:
+    """Compiled catalogue, from the disk cache when its sources are unchanged."""
+    key = source_key()
+    path = os.path.join(_CACHE_DIR, f"catalogue-{key[:16]}.pickle")
+    try:
+        with open(path, "rb") as f:
+            cached_key, rooms, issues = pickle.load(f)
+        if cached_key == key:
+            return rooms, issues
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError, ImportError):
+        pass
+
+    rooms, issues = compile_catalogue(room_data.ROOM_CATALOGUE)
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((key, rooms, issues), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        # caches of older sources are never read again
+        for name in os.listdir(_CACHE_DIR):
+            if name.startswith("catalogue-") and name.endswith(".pickle") and name != os.path.basename(path):
+                os.remove(os.path.join(_CACHE_DIR, name))
+    except OSError:
+        pass
+    return rooms, issues
+
+
+def report_issues(issues: Issues, kind: str, label: str) -> None:
+    """One CatalogueWarning listing every tolerated problem of a kind."""
+    found = issues.get(kind, ())
+    if found:
+        warnings.warn(
+            f"{len(found)} {label}:\n  " + "\n  ".join(found),
+            CatalogueWarning,
+            stacklevel=2,
+        )
+
+
+CATALOGUE, ISSUES = load_catalogue()
+report_issues(ISSUES, PLACEMENT, "placement clauses ignored")
+report_issues(ISSUES, EFFECT, "room effects ignored")
+report_issues(ISSUES, LOOT, "loot objects ignored")
+BY_NAME: Dict[str, CompiledRoom] = {room.name: room for room in CATALOGUE}
+# rooms whose effect fires on every move while they stand in the manor
+PASSIVE_ROOMS = frozenset(
+    room.index for room in CATALOGUE if room.effect is not None and room.effect.trigger == PASSIVE
+)
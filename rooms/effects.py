@@ -0,0 +1,132 @@
+"""
+Room effects.
+
+Each effect name is registered once with its handler; `compile_effect`
+turns a RoomDef's effect_id / effect_value into an Effect bound to that
+handler, to a validated (min, max) amount and to a trigger. The engine
+never looks at effect names again: it calls `effect.fire(inventory, rng)`
+at the moments its trigger names.
+
+An effect id is an effect name, optionally prefixed by its trigger:
+
+    [enter: | first: | draft: | passive:]<name>
+
+    enter    every time the player walks into the room (the default)
+    first    the first time the player walks into it
+    draft    once, when the room is drafted
+    passive  on every move of the player while the room stands in the manor
+
+Handlers take the inventory and the rolled amount (None for effects
+without one) and may return a message for the event log. Effects that
+only add to one resource are registered with `resource_effect`, which
+records the resource too (batch_sim reads it to vectorize them).
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+ENTER = "enter"
+FIRST = "first"
+DRAFT = "draft"
+PASSIVE = "passive"
+TRIGGERS = (ENTER, FIRST, DRAFT, PASSIVE)
+
+Handler = Callable[..., Optional[str]]
+
+
+@dataclass(frozen=True, slots=True)
+class EffectKind:
+    name: str
+    handler: Handler
+    takes_amount: bool
+    resource: Optional[str] = None    # resource added to, for resource_effect
+
+
+REGISTRY: Dict[str, EffectKind] = {}
+
+
+def register(name: str, takes_amount: bool = True, resource: Optional[str] = None):
+    """Decorator: registers `handler(inventory, amount)` under name."""
+    def decorate(handler: Handler) -> Handler:
+        if name in REGISTRY:
+            raise ValueError(f"effect already registered: {name}")
+        REGISTRY[name] = EffectKind(name, handler, takes_amount, resource)
+        return handler
+    return decorate
+
+
+@dataclass(frozen=True, slots=True)
+class AddResource:
+    """Handler adding the amount (or 1) of one inventory resource."""
+    resource: str
+
+    def __call__(self, inv, n) -> None:
+        inv.apply({self.resource: 1 if n is None else n})
+
+
+def resource_effect(name: str, resource: str, takes_amount: bool = True) -> None:
+    """Registers an effect that only adds to one inventory resource."""
+    register(name, takes_amount, resource)(AddResource(resource))
+
+
+@dataclass(frozen=True, slots=True)
+class Effect:
+    """A room's effect, compiled: handler, trigger and amount bounds."""
+    name: str
+    trigger: str
+    handler: Handler
+    amount: Optional[Tuple[int, int]]
+
+    def fire(self, inv, rng) -> Optional[str]:
+        value = None
+        if self.amount is not None:
+            lo, hi = self.amount
+            value = lo if lo == hi else rng.randint(lo, hi)
+        return self.handler(inv, value)
+
+    def __str__(self) -> str:
+        text = self.name if self.trigger == ENTER else f"{self.trigger}:{self.name}"
+        if self.amount is None:
+            return text
+        lo, hi = self.amount
+        return f"{text} +{lo}" if lo == hi else f"{text} +{lo}..{hi}"
+
+
+# -----------------------------------------------------------------
+# BUILT-IN EFFECTS
+# -----------------------------------------------------------------
+
+resource_effect("add_step", "steps")
+resource_effect("add_coin", "coins")
+resource_effect("add_gem", "gems")
+resource_effect("add_key", "keys")
+resource_effect("add_dice", "dice")
+resource_effect("lockpick", "lockpick", takes_amount=False)
+resource_effect("metaldetector", "metal_detector", takes_amount=False)
+
+
+# -----------------------------------------------------------------
+# COMPILATION
+# -----------------------------------------------------------------
+
+def compile_effect(effect_id: Optional[str], value: Union[None, int, Tuple[int, int]]
+                   ) -> Tuple[Optional[Effect], List[str]]:
+    """(effect or None, problems) for a RoomDef's effect_id / effect_value."""
+    if not effect_id:
+        return None, []
+    trigger, _, name = effect_id.strip().rpartition(":")
+    trigger = trigger or ENTER
+    if trigger not in TRIGGERS:
+        return None, [f"unknown effect trigger {trigger!r} in {effect_id!r}"]
+    kind = REGISTRY.get(name)
+    if kind is None:
+        return None, [f"unknown effect id {effect_id!r}"]
+
+    if not kind.takes_amount:
+        return Effect(name, trigger, kind.handler, None), []
+    if isinstance(value, int):
+        value = (value, value)
+    if (not isinstance(value, tuple) or len(value) != 2
+            or not all(isinstance(v, int) for v in value) or not 0 <= value[0] <= value[1]):
+        return None, [f"invalid amount {value!r} for effect {effect_id!r}"]
+    return Effect(name, trigger, kind.handler, value), []
@@ -0,0 +1,114 @@
+"""
+Room loot.
+
+Every name in RoomDef.objects_in_room is looked up in OBJECTS and compiled
+into a LootItem: the resource it adds to (a column of RESOURCES), a
+multiplier and the (min, max) count. Names that are not resources
+("chest", "dig spots", typos...) are reported as a CatalogueWarning
+whenever the catalogue is loaded instead of being skipped on every visit.
+
+`roll` samples one room's loot for the live game. `LootTable` packs the
+whole catalogue into NumPy arrays and samples the loot of many rooms in
+one vectorized draw, for the batch simulations.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+RESOURCES = ("steps", "coins", "gems", "keys", "dice",
+             "lockpick", "metal_detector", "rabbit_foot", "shovel")
+RESOURCE_INDEX: Dict[str, int] = {name: i for i, name in enumerate(RESOURCES)}
+PERMANENTS = frozenset(("lockpick", "metal_detector", "rabbit_foot", "shovel"))
+
+# object name -> (resource, amount per object)
+OBJECTS: Dict[str, Tuple[str, int]] = {
+    "apple": ("steps", 2),
+    "banana": ("steps", 2),
+    "cupcake": ("steps", 2),
+    "orange": ("steps", 2),
+    "key": ("keys", 1),
+    "keys": ("keys", 1),
+    "gem": ("gems", 1),
+    "coin": ("coins", 1),
+    "dice": ("dice", 1),
+    "lockpick": ("lockpick", 1),
+    "metaldetector": ("metal_detector", 1),
+    "paw": ("rabbit_foot", 1),
+    "shovel": ("shovel", 1),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class LootItem:
+    name: str
+    resource: int     # index in RESOURCES
+    scale: int        # resource units per object
+    lo: int
+    hi: int
+
+    @property
+    def resource_name(self) -> str:
+        return RESOURCES[self.resource]
+
+
+def compile_loot(objects: Mapping[str, Tuple[int, int]]) -> Tuple[Tuple[LootItem, ...], List[str]]:
+    """(items, problems) for a RoomDef's objects_in_room."""
+    items = []
+    problems = []
+    for name, bounds in objects.items():
+        target = OBJECTS.get(name)
+        if target is None:
+            problems.append(f"unknown loot object {name!r}")
+            continue
+        if (not isinstance(bounds, tuple) or len(bounds) != 2
+                or not all(isinstance(v, int) for v in bounds) or not 0 <= bounds[0] <= bounds[1]):
+            problems.append(f"invalid count {bounds!r} for loot object {name!r}")
+            continue
+        resource, scale = target
+        items.append(LootItem(name, RESOURCE_INDEX[resource], scale, *bounds))
+    return tuple(items), problems
+
+
+# -----------------------------------------------------------------
+# SAMPLING
+# -----------------------------------------------------------------
+
+def roll(items: Iterable[LootItem], rng) -> List[Tuple[LootItem, int]]:
+    """(item, count) for each object found at least once; fixed counts draw nothing."""
+    found = []
+    for item in items:
+        count = item.lo if item.lo == item.hi else rng.randint(item.lo, item.hi)
+        if count > 0:
+            found.append((item, count))
+    return found
+
+
+class LootTable:
+    """
+    Loot of a whole catalogue as (n_rooms, m) arrays, m being the largest
+    loot list. sample() draws the loot of P rooms at once.
+    """
+
+    def __init__(self, rooms):
+        import numpy as np
+
+        n = len(rooms)
+        m = max((len(room.loot) for room in rooms), default=0) or 1
+        self.lo = np.zeros((n, m), dtype=np.int64)
+        self.hi = np.zeros((n, m), dtype=np.int64)
+        # gain[i, j, r] : units of resource r per object j of room i
+        self.gain = np.zeros((n, m, len(RESOURCES)), dtype=np.int64)
+        for i, room in enumerate(rooms):
+            for j, item in enumerate(room.loot):
+                self.lo[i, j], self.hi[i, j] = item.lo, item.hi
+                self.gain[i, j, item.resource] = item.scale
+        self.permanent = np.array([name in PERMANENTS for name in RESOURCES])
+
+    def sample(self, rooms, rng):
+        """Resources found in each of the rooms (P,) -> (P, len(RESOURCES)) ; rng : numpy Generator."""
+        import numpy as np
+
+        counts = rng.integers(self.lo[rooms], self.hi[rooms] + 1)
+        gains = np.einsum("pm,pmr->pr", counts, self.gain[rooms])
+        gains[:, self.permanent] = np.minimum(gains[:, self.permanent], 1)
+        return gains
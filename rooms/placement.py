@@ -0,0 +1,175 @@
+"""
+Placement rules.
+
+A room's placement text (RoomDef.placement_condition) and its allowed_rows
+are parsed into a PlacementRule, which `compile_rule` turns into four
+bitboards of the cells where the room may be drafted, one per entry side
+(the side of the new room the player walks in through, 0=up 1=right
+2=down 3=left, as in manor.DOOR_INDEX). Checking a placement is then a
+single bit test: `allowed[entry_side] >> cell & 1`.
+
+Rule language (case-insensitive; clauses are ANDed; filler words such as
+"only", "draftable", "into", "the" are ignored):
+
+    border | border only | edges      outer ring of the grid
+    interior | not edges              everything but the outer ring
+    rank N | ranks N to M | ranks N-M ranks, from the entrance (1) to the top (GRID_ROWS)
+    west wing | east wing             columns left / right of the middle column
+    from north [or west ...]          facing of the door the room is drafted from
+    R,C                               one cell: rank R, column C (1-based, from the west)
+
+Any other word is reported as a problem and the clause it belongs to is
+not enforced.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from board import BORDER_MASK, FULL_MASK
+from constants import GRID_COLS, GRID_ROWS
+
+ALL_SIDES = 0b1111
+
+# door facing -> door index (0=up 1=right 2=down 3=left)
+FACINGS = {"north": 0, "east": 1, "south": 2, "west": 3}
+
+FILLER = frozenset((
+    "only", "draftable", "drafted", "be", "can", "may", "into", "within", "in",
+    "on", "the", "a", "and", "or", "facing", "door", "doors",
+))
+
+# (name, pattern), tried in this order; each match is removed from the text
+_FACING = r"(?:north|east|south|west)"
+_CLAUSES = (
+    ("cell", re.compile(r"\b(\d+)\s*,\s*(\d+)\b")),
+    ("ranks", re.compile(r"\branks?\s+(\d+)(?:\s*(?:-|to)\s*(\d+))?\b")),
+    ("interior", re.compile(r"\b(?:not[\s_]+edges?|interior)\b")),
+    ("border", re.compile(r"\b(?:border(?:[\s_]+only)?|edges?)\b")),
+    ("wing", re.compile(r"\b(west|east)[\s_]+wing\b")),
+    ("from", re.compile(rf"\bfrom\s+({_FACING}(?:\s*(?:,|or|and)\s*{_FACING})*)\b")),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PlacementRule:
+    """Parsed constraints; None (or ALL_SIDES) means unconstrained."""
+    border: Optional[bool] = None              # True: outer ring, False: interior
+    ranks: Optional[Tuple[int, int]] = None    # inclusive, 1 = entrance rank
+    wing: Optional[str] = None                 # "west" or "east"
+    cell: Optional[Tuple[int, int]] = None     # (rank, column), 1-based
+    from_facings: int = ALL_SIDES              # door facings (bit = FACINGS value)
+
+
+# -----------------------------------------------------------------
+# PARSING
+# -----------------------------------------------------------------
+
+def parse_rule(text: Optional[str], allowed_rows: Optional[Tuple[int, int]] = None
+               ) -> Tuple[PlacementRule, List[str]]:
+    """(rule, problems) for a placement text and an optional rank range."""
+    problems: List[str] = []
+    fields = {}
+
+    if allowed_rows is not None:
+        ranks = _rank_range(allowed_rows, f"allowed_rows {allowed_rows}", problems)
+        if ranks is not None:
+            fields["ranks"] = ranks
+
+    rest = (text or "").lower()
+    for name, pattern in _CLAUSES:
+        for match in pattern.finditer(rest):
+            _apply(name, match, fields, problems)
+        rest = pattern.sub(" ", rest)
+
+    if fields.get("ranks") == (1, GRID_ROWS):
+        del fields["ranks"]
+
+    unknown = [word for word in re.findall(r"[a-z0-9']+", rest) if word not in FILLER]
+    if unknown:
+        problems.append(f"unsupported placement words {' '.join(unknown)!r} in {text!r}")
+    return PlacementRule(**fields), problems
+
+
+def _apply(name: str, match, fields: dict, problems: List[str]) -> None:
+    if name == "cell":
+        rank, col = int(match.group(1)), int(match.group(2))
+        if 1 <= rank <= GRID_ROWS and 1 <= col <= GRID_COLS:
+            fields["cell"] = (rank, col)
+        else:
+            problems.append(f"cell {rank},{col} is outside the grid")
+    elif name == "ranks":
+        lo = int(match.group(1))
+        hi = int(match.group(2) or lo)
+        ranks = _rank_range((lo, hi), match.group(0), problems)
+        if ranks is not None:
+            old = fields.get("ranks")
+            if old is not None:
+                ranks = (max(old[0], ranks[0]), min(old[1], ranks[1]))
+            fields["ranks"] = ranks
+    elif name in ("border", "interior"):
+        border = name == "border"
+        if fields.get("border", border) != border:
+            problems.append("both border and interior")
+        fields["border"] = border
+    elif name == "wing":
+        fields["wing"] = match.group(1)
+    elif name == "from":
+        facings = 0
+        for word in re.findall(_FACING, match.group(1)):
+            facings |= 1 << FACINGS[word]
+        fields["from_facings"] = fields.get("from_facings", ALL_SIDES) & facings
+
+
+def _rank_range(bounds: Tuple[int, int], label: str, problems: List[str]) -> Optional[Tuple[int, int]]:
+    """Clips (lo, hi) to the grid's ranks; None (with a problem) when nothing is left."""
+    lo, hi = bounds
+    clipped = (max(lo, 1), min(hi, GRID_ROWS))
+    if lo > hi or clipped[0] > clipped[1]:
+        problems.append(f"{label} has no rank within 1..{GRID_ROWS}, ignored")
+        return None
+    return clipped
+
+
+# -----------------------------------------------------------------
+# COMPILATION
+# -----------------------------------------------------------------
+
+def _cells(predicate) -> int:
+    mask = 0
+    for r in range(GRID_ROWS):
+        for c in range(GRID_COLS):
+            if predicate(r, c):
+                mask |= 1 << (r * GRID_COLS + c)
+    return mask
+
+
+WING_CELLS = {
+    "west": _cells(lambda r, c: c < GRID_COLS // 2),
+    "east": _cells(lambda r, c: c > GRID_COLS // 2),
+}
+
+
+def rank_of(r: int) -> int:
+    """Rank of grid row r (row 0 is the top, rank 1 the entrance row)."""
+    return GRID_ROWS - r
+
+
+def compile_rule(rule: PlacementRule) -> Tuple[int, int, int, int]:
+    """Allowed-cell bitboards, indexed by the entry side of the new room."""
+    cells = FULL_MASK
+    if rule.border is not None:
+        cells &= BORDER_MASK if rule.border else FULL_MASK & ~BORDER_MASK
+    if rule.ranks is not None:
+        lo, hi = rule.ranks
+        cells &= _cells(lambda r, c: lo <= rank_of(r) <= hi)
+    if rule.wing is not None:
+        cells &= WING_CELLS[rule.wing]
+    if rule.cell is not None:
+        rank, col = rule.cell
+        cells &= 1 << ((GRID_ROWS - rank) * GRID_COLS + col - 1)
+    # drafted from a door facing d: the player enters the new room by its side d + 2
+    return tuple(
+        cells if rule.from_facings >> ((side + 2) % 4) & 1 else 0
+        for side in range(4)
+    )
@@ -1,14 +1,59 @@
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional, Union, Dict
 
+
+# -----------------------------------------------------------------
+# 0. DOOR MASKS
+# -----------------------------------------------------------------
+# Doors are packed into a 4-bit mask: bit i is set when the door at
+# index i of (Up, Right, Down, Left) exists.
+
+def doors_to_mask(doors: Tuple[bool, bool, bool, bool]) -> int:
+    """Packs a (Up, Right, Down, Left) tuple into a 4-bit mask."""
+    mask = 0
+    for i, has_door in enumerate(doors):
+        if has_door:
+            mask |= 1 << i
+    return mask
+
+
+def mask_to_doors(mask: int) -> Tuple[bool, bool, bool, bool]:
+    """Unpacks a 4-bit mask back into a (Up, Right, Down, Left) tuple."""
+    return tuple(bool(mask & (1 << i)) for i in range(4))
+
+
+def rotate_mask(mask: int, orientation: int) -> int:
+    """Rotates a door mask clockwise by orientation * 90 degrees."""
+    steps = orientation % 4
+    if steps == 0:
+        return mask
+    return ((mask << steps) | (mask >> (4 - steps))) & 0xF
+
+
+def distinct_rotations(mask: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    Returns the (orientation, mask) pairs of the 4 rotations, keeping only
+    the first orientation for symmetric shapes (e.g. a corridor has 2).
+    """
+    seen = set()
+    rotations = []
+    for orientation in range(4):
+        rotated = rotate_mask(mask, orientation)
+        if rotated in seen:
+            continue
+        seen.add(rotated)
+        rotations.append((orientation, rotated))
+    return tuple(rotations)
+
 # -----------------------------------------------------------------
 # 1. THE "BLUEPRINT" (The dataclass)
 # -----------------------------------------------------------------
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class RoomDef:
     """
     Represents the 'blueprint' or 'encyclopedia entry' for a single room type.
     This is the static, unchanging data from the game's design.
+    Compared by identity: the game uses rooms.catalogue.CompiledRoom.
     """
     
     # --- Core Properties (Almost every room has these) ---
@@ -35,6 +80,8 @@ class RoomDef:
     # e.g., {"chest": (1, 2), "gem": (5, 10)}
     objects_in_room: Dict[str, Tuple[int, int]] = field(default_factory=dict)
 
+    # Door mask, rotations etc. are derived by rooms.catalogue.compile_room.
+
 
 # -----------------------------------------------------------------
 # 2. THE "MASTER DATABASE" (The Catalogue)
@@ -0,0 +1,298 @@
+"""
+Sauvegarde / chargement d'une partie en binaire compact et versionné.
+
+Les salles sont désignées par leur index dans CATALOGUE (2 octets, pour
+les catalogues étendus) ; une pièce posée tient sur 3 octets (salle,
+portes | orientation | fouillée). Entiers petit-boutistes :
+
+    "BPSV" | version u8
+    graine : len u16 + utf-8 | forks u32
+    flux créés : masque u8 (ordre rng.STREAMS), puis pour chacun
+        625 x u32 (état Mersenne Twister) | gauss présent u8 | gauss f64
+    pioche : n u16 | n x salle u16 (ordre du mélange)
+        | salles restantes : len u16 + bitmap (bit i = salle i encore là)
+    plateau : cases occupées u64 | par case : salle u16 | pièce u8
+    inventaire : steps, coins, gems, keys, dice en i32 | permanents u8
+    joueur : ligne u8 | colonne u8 | direction u8
+    message : len u16 + utf-8 | fin de partie : len u16 + utf-8 (0xFFFF = aucune)
+    tirage : présent u8 [| case u8 | direction u8 | n u8 | n x (salle u16, orientation u8)]
+
+L'historique et le journal d'actions ne sont pas sauvegardés. Plusieurs
+états peuvent être mis bout à bout dans un même fichier (save_many /
+load_many), chacun précédé de sa taille (u32).
+
+Une sauvegarde tronquée ou incohérente lève ValueError.
+"""
+
+import struct
+from typing import Iterable, Iterator, List
+
+from board import cell_index, cell_coords
+from constants import GRID_COLS, GRID_ROWS, N_CELLS
+from deck import Deck
+from engine import Draft, GameState
+from inventory.inventory import Inventory
+from manor import Manor, Room, Candidate, DIRECTIONS, DOOR_INDEX, OPPOSITE_DIR
+from player import Player
+from rng import GameRng, STREAMS
+from rooms.catalogue import CATALOGUE
+from zobrist import DIR_NAMES
+
+MAGIC = b"BPSV"
+VERSION = 2
+
+COUNTERS = ("steps", "coins", "gems", "keys", "dice")
+PERMANENTS = ("lockpick", "rabbit_foot", "metal_detector", "shovel")
+NO_TEXT = 0xFFFF
+# un tirage propose 1 à 3 salles (cf. Manor.draw_candidates)
+MAX_CANDIDATES = 3
+
+_MT_STATE = struct.Struct("<625I")
+_GAUSS = struct.Struct("<Bd")
+_INVENTORY = struct.Struct("<5iB")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_CELL = struct.Struct("<HB")
+
+
+# ==========================
+# Écriture
+# ==========================
+
+def _text(out: List[bytes], value) -> None:
+    if value is None:
+        out.append(_U16.pack(NO_TEXT))
+        return
+    data = value.encode("utf-8")
+    out.append(_U16.pack(len(data)))
+    out.append(data)
+
+
+def dumps(state: GameState) -> bytes:
+    out: List[bytes] = [MAGIC, _U8.pack(VERSION)]
+
+    # flux aléatoires
+    rng = state.rng
+    _text(out, str(rng.seed))
+    out.append(_U32.pack(rng.forks))
+    streams = rng.getstate()
+    out.append(_U8.pack(sum(1 << i for i, name in enumerate(STREAMS) if name in streams)))
+    for name in STREAMS:
+        if name in streams:
+            _version, words, gauss = streams[name]
+            out.append(_MT_STATE.pack(*words))
+            out.append(_GAUSS.pack(gauss is not None, gauss or 0.0))
+
+    # pioche : ordre complet + salles encore présentes
+    deck = state.manor.deck
+    n = len(deck.rooms)
+    out.append(_U16.pack(n))
+    out.append(struct.pack(f"<{n}H", *(rd.index for rd in deck.rooms)))
+    live = sum(1 << slot for slot, present in enumerate(deck.live) if present)
+    bitmap = live.to_bytes((n + 7) // 8, "little")
+    out.append(_U16.pack(len(bitmap)))
+    out.append(bitmap)
+
+    # plateau
+    board = state.manor.board
+    out.append(_U64.pack(board.occupied))
+    for room in board.rooms:
+        if room is not None:
+            out.append(_CELL.pack(room.index, room.bits & 0x7F))
+
+    # inventaire, joueur, scène
+    inv = state.inventory
+    permanents = sum(1 << i for i, name in enumerate(PERMANENTS) if getattr(inv, name))
+    out.append(_INVENTORY.pack(*(getattr(inv, name) for name in COUNTERS), permanents))
+    player = state.player
+    out.append(bytes((player.r, player.c, DOOR_INDEX[player.dir])))
+    _text(out, state.message)
+    _text(out, state.game_over)
+
+    draft = state.draft
+    if draft is None:
+        out.append(_U8.pack(0))
+    else:
+        r, c = draft.pos
+        out.append(bytes((1, cell_index(r, c), DOOR_INDEX[draft.from_dir], len(draft.candidates))))
+        for cand, orientation in zip(draft.candidates, draft.orientations):
+            out.append(_CELL.pack(cand.room.index, orientation))
+    return b"".join(out)
+
+
+# ==========================
+# Lecture
+# ==========================
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def unpack(self, fmt: struct.Struct):
+        return fmt.unpack(self.raw(fmt.size))
+
+    def byte(self) -> int:
+        return self.raw(1)[0]
+
+    def raw(self, n: int) -> bytes:
+        value = self.data[self.pos:self.pos + n]
+        if len(value) < n:
+            raise ValueError("sauvegarde tronquée")
+        self.pos += n
+        return value
+
+    def text(self):
+        (n,) = self.unpack(_U16)
+        if n == NO_TEXT:
+            return None
+        return self.raw(n).decode("utf-8")
+
+
+def _room(index: int):
+    if index >= len(CATALOGUE):
+        raise ValueError(f"salle inconnue : {index}")
+    return CATALOGUE[index]
+
+
+def _index(value: int, size: int, what: str) -> int:
+    if value >= size:
+        raise ValueError(f"{what} invalide : {value}")
+    return value
+
+
+def loads(data: bytes) -> GameState:
+    """État sauvegardé par dumps ; ValueError si data est tronqué ou corrompu."""
+    if data[:4] != MAGIC:
+        raise ValueError("pas une sauvegarde de partie")
+    try:
+        return _loads(_Reader(data, 4))
+    except (struct.error, UnicodeDecodeError, TypeError) as e:
+        raise ValueError(f"sauvegarde corrompue : {e}") from e
+
+
+def _loads(reader: _Reader) -> GameState:
+    version = reader.byte()
+    if version != VERSION:
+        raise ValueError(f"version de sauvegarde non gérée : {version}")
+
+    # flux aléatoires
+    rng = GameRng(reader.text())
+    (rng.forks,) = reader.unpack(_U32)
+    created = reader.byte()
+    streams = {}
+    for i, name in enumerate(STREAMS):
+        if created >> i & 1:
+            words = reader.unpack(_MT_STATE)
+            has_gauss, gauss = reader.unpack(_GAUSS)
+            streams[name] = (3, words, gauss if has_gauss else None)
+    rng.setstate(streams)
+
+    # pioche
+    (n,) = reader.unpack(_U16)
+    order = [_room(i) for i in struct.unpack(f"<{n}H", reader.raw(2 * n))]
+    (size,) = reader.unpack(_U16)
+    live = int.from_bytes(reader.raw(size), "little")
+    if live >> n:
+        raise ValueError("pioche : salles restantes hors de la pioche")
+    deck = Deck(order, [live >> slot & 1 for slot in range(n)])
+
+    # plateau
+    (occupied,) = reader.unpack(_U64)
+    if occupied >> N_CELLS:
+        raise ValueError("plateau : case hors de la grille")
+    rooms = []
+    while occupied:
+        idx = (occupied & -occupied).bit_length() - 1
+        occupied &= occupied - 1
+        index, packed = reader.unpack(_CELL)
+        _room(index)
+        rooms.append((idx, Room.from_bits(index << 7 | packed & 0x7F)))
+    manor = Manor.assemble(rng, deck, rooms)
+
+    # inventaire, joueur, scène
+    *counters, permanents = reader.unpack(_INVENTORY)
+    inv = Inventory()
+    for name, value in zip(COUNTERS, counters):
+        setattr(inv, name, value)
+    for i, name in enumerate(PERMANENTS):
+        setattr(inv, name, bool(permanents >> i & 1))
+    r, c, d = reader.raw(3)
+    player = Player(_index(r, GRID_ROWS, "ligne"), _index(c, GRID_COLS, "colonne"), inv)
+    player.dir = DIR_NAMES[_index(d, 4, "direction")]
+    if manor.grid[player.r][player.c] is None:
+        raise ValueError("joueur sur une case vide")
+    message = reader.text()
+    game_over = reader.text()
+
+    draft = None
+    if reader.byte():
+        cell, from_dir, n = reader.raw(3)
+        r, c = cell_coords(_index(cell, N_CELLS, "case"))
+        from_dir = DIR_NAMES[_index(from_dir, 4, "direction")]
+        # tirage ouvert par advance() : case vide, voisine du joueur dans la direction from_dir
+        dr, dc = DIRECTIONS[from_dir]
+        if (r, c) != (player.r + dr, player.c + dc) or manor.grid[r][c] is not None:
+            raise ValueError("tirage : case invalide")
+        if not 1 <= n <= MAX_CANDIDATES:
+            raise ValueError(f"tirage : {n} candidats")
+        entry_dir_idx = DOOR_INDEX[OPPOSITE_DIR[from_dir]]
+        candidates, orientations, doors_list = [], [], []
+        for _ in range(n):
+            index, orientation = reader.unpack(_CELL)
+            rd = _room(index)
+            if rd not in manor.deck:
+                raise ValueError(f"tirage : {rd.name} n'est plus dans la pioche")
+            _index(orientation, 4, "orientation")
+            # rotations légales recalculées sur le plateau reconstruit
+            options = manor.cached_rotations(rd, r, c, entry_dir_idx)
+            cand = Candidate(rd, options, rd.gem_cost)
+            doors = cand.doors_for(orientation)
+            candidates.append(cand)
+            orientations.append(orientation)
+            doors_list.append(rd.door_mask if doors is None else doors)
+        draft = Draft((r, c), from_dir, candidates, orientations, doors_list)
+
+    return GameState.assemble(rng, manor, inv, player, message or "", draft, game_over)
+
+
+# ==========================
+# Fichiers
+# ==========================
+
+def save(state: GameState, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(dumps(state))
+
+
+def load(path: str) -> GameState:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def save_many(states: Iterable[GameState], path: str) -> int:
+    """Écrit les états bout à bout ; renvoie leur nombre."""
+    count = 0
+    with open(path, "wb") as f:
+        for state in states:
+            data = dumps(state)
+            f.write(_U32.pack(len(data)))
+            f.write(data)
+            count += 1
+    return count
+
+
+def load_many(path: str) -> Iterator[GameState]:
+    """Relit un fichier de save_many, un état à la fois."""
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = 0
+    while pos < len(data):
+        (n,) = _U32.unpack_from(data, pos)
+        pos += 4
+        yield loads(data[pos:pos + n])
+        pos += n
@@ -0,0 +1,331 @@
+"""
+Simulation Monte Carlo en lot (sans pygame).
+
+Joue des parties complètes avec une politique interchangeable, réparties par
+paquets sur un ProcessPoolExecutor. Chaque partie a sa propre graine dérivée
+de (graine de base, numéro de partie) : les résultats ne dépendent ni du
+nombre de processus ni de la taille des paquets. Les résumés de paquets sont
+agrégés au fil de l'eau dans le processus parent.
+
+Exemple :
+    python simulate.py --games 100000 --workers 8 --policy simulate:greedy_policy
+"""
+
+import argparse
+import importlib
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from engine import GameState
+from manor import DIRECTIONS, DOOR_INDEX
+from rng import spawn_seed
+
+# ressources suivies pièce après pièce
+RESOURCES = ("steps", "gems", "keys", "coins", "dice")
+
+Action = Tuple
+Policy = Callable[[GameState, random.Random], Optional[Action]]
+
+
+# ==========================
+# Politiques
+# ==========================
+
+def _open_dirs(state: GameState) -> List[str]:
+    here = state.current_room()
+    return [d for d in DIRECTIONS if here.has_door(DOOR_INDEX[d])]
+
+
+def _affordable(state: GameState) -> List[int]:
+    gems = state.inventory.gems
+    return [i for i, cand in enumerate(state.draft.candidates) if cand.gem_cost <= gems]
+
+
+def _draft_choice(state: GameState, choice: Optional[int]) -> Optional[Action]:
+    if choice is not None:
+        return ("choose", choice)
+    if state.inventory.dice > 0:
+        return ("reroll",)
+    return None
+
+
+def _walk(state: GameState, dname: str) -> Action:
+    if state.player.dir != dname:
+        return ("face", dname)
+    return ("advance",)
+
+
+def random_policy(state: GameState, rng: random.Random) -> Optional[Action]:
+    """Porte au hasard, candidat abordable au hasard."""
+    if state.draft is not None:
+        affordable = _affordable(state)
+        return _draft_choice(state, rng.choice(affordable) if affordable else None)
+    dirs = _open_dirs(state)
+    if not dirs:
+        return None
+    if state.player.dir in dirs and rng.random() < 0.5:
+        return ("advance",)
+    return _walk(state, rng.choice(dirs))
+
+
+def greedy_policy(state: GameState, rng: random.Random) -> Optional[Action]:
+    """Vise l'objectif (haut d'abord), prend le candidat le moins cher."""
+    if state.draft is not None:
+        affordable = _affordable(state)
+        choice = None
+        if affordable:
+            choice = min(affordable, key=lambda i: state.draft.candidates[i].gem_cost)
+        return _draft_choice(state, choice)
+    dirs = _open_dirs(state)
+    if not dirs:
+        return None
+    gr, gc = state.manor.goal
+    preferred = ["up"]
+    if state.player.c < gc:
+        preferred.append("right")
+    elif state.player.c > gc:
+        preferred.append("left")
+    ordered = [d for d in preferred if d in dirs]
+    if ordered and rng.random() < 0.8:
+        return _walk(state, ordered[0])
+    return _walk(state, rng.choice(dirs))
+
+
+def resolve_policy(policy: Union[str, Policy]) -> Policy:
+    """Accepte une politique ou son chemin "module:fonction"."""
+    if callable(policy):
+        return policy
+    module_name, _, attr = policy.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+# ==========================
+# Une partie
+# ==========================
+
+@dataclass
+class GameResult:
+    won: bool
+    steps_left: int
+    rooms_placed: int
+    actions: int
+    # ressources (RESOURCES) après chaque pièce visitée
+    trajectory: List[Tuple[int, ...]] = field(default_factory=list)
+
+
+def game_seed(base_seed: int, game_index: int) -> str:
+    """Graine propre à une partie : flux indépendants de ceux des autres parties."""
+    return spawn_seed(base_seed, game_index)
+
+
+def _resources(state: GameState) -> Tuple[int, ...]:
+    inv = state.inventory
+    return tuple(getattr(inv, name) for name in RESOURCES)
+
+
+def play_game(seed, policy: Policy, max_actions: int = 5000) -> GameResult:
+    """Joue une partie jusqu'à la fin, au blocage de la politique ou à max_actions."""
+    # flux de la partie (moteur) et de la politique séparés
+    state = GameState(seed=seed)
+    rng = random.Random(f"{seed}:policy")
+    trajectory = []
+    position = (state.player.r, state.player.c)
+
+    actions = 0
+    while state.game_over is None and actions < max_actions:
+        action = policy(state, rng)
+        if action is None:
+            break
+        state.apply(action)
+        actions += 1
+        now = (state.player.r, state.player.c)
+        if now != position:
+            position = now
+            trajectory.append(_resources(state))
+
+    placed = sum(1 for row in state.manor.grid for room in row if room is not None)
+    return GameResult(
+        won=state.game_over is not None and state.game_over.startswith("Victoire"),
+        steps_left=state.inventory.steps,
+        rooms_placed=placed,
+        actions=actions,
+        trajectory=trajectory,
+    )
+
+
+# ==========================
+# Agrégation
+# ==========================
+
+@dataclass
+class SimStats:
+    """Statistiques cumulées, fusionnables (un par paquet, puis total)."""
+    horizon: int = 50
+    games: int = 0
+    wins: int = 0
+    steps_left: int = 0
+    rooms_placed: int = 0
+    actions: int = 0
+    # sommes et effectifs des ressources à la n-ième pièce visitée
+    trajectory_sums: List[List[int]] = field(default_factory=list)
+    trajectory_counts: List[int] = field(default_factory=list)
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        self.wins += result.won
+        self.steps_left += result.steps_left
+        self.rooms_placed += result.rooms_placed
+        self.actions += result.actions
+        for i, values in enumerate(result.trajectory[:self.horizon]):
+            if i == len(self.trajectory_counts):
+                self.trajectory_sums.append([0] * len(RESOURCES))
+                self.trajectory_counts.append(0)
+            sums = self.trajectory_sums[i]
+            for j, value in enumerate(values):
+                sums[j] += value
+            self.trajectory_counts[i] += 1
+
+    def merge(self, other: "SimStats") -> None:
+        self.games += other.games
+        self.wins += other.wins
+        self.steps_left += other.steps_left
+        self.rooms_placed += other.rooms_placed
+        self.actions += other.actions
+        for i, count in enumerate(other.trajectory_counts):
+            if i == len(self.trajectory_counts):
+                self.trajectory_sums.append([0] * len(RESOURCES))
+                self.trajectory_counts.append(0)
+            sums = self.trajectory_sums[i]
+            for j, value in enumerate(other.trajectory_sums[i]):
+                sums[j] += value
+            self.trajectory_counts[i] += count
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    def mean_trajectory(self) -> List[Tuple[float, ...]]:
+        return [
+            tuple(value / count for value in sums)
+            for sums, count in zip(self.trajectory_sums, self.trajectory_counts)
+        ]
+
+    def summary(self) -> str:
+        n = max(self.games, 1)
+        lines = [
+            f"Parties : {self.games}",
+            f"Taux de victoire : {100 * self.win_rate:.2f} %",
+            f"Pas restants (moy.) : {self.steps_left / n:.2f}",
+            f"Pièces posées (moy.) : {self.rooms_placed / n:.2f}",
+            f"Actions (moy.) : {self.actions / n:.1f}",
+        ]
+        trajectory = self.mean_trajectory()
+        if trajectory:
+            lines.append("Ressources moyennes par pièce visitée (" + ", ".join(RESOURCES) + ") :")
+            for i, values in enumerate(trajectory[:10], 1):
+                lines.append(f"  {i:>3}: " + "  ".join(f"{v:8.2f}" for v in values))
+        return "\n".join(lines)
+
+
+# ==========================
+# Répartition multi-processus
+# ==========================
+
+def run_chunk(base_seed: int, start: int, count: int, policy: Union[str, Policy],
+              max_actions: int = 5000, horizon: int = 50) -> SimStats:
+    """Joue les parties [start, start + count) et renvoie leur résumé."""
+    policy_fn = resolve_policy(policy)
+    stats = SimStats(horizon=horizon)
+    for game_index in range(start, start + count):
+        stats.add(play_game(game_seed(base_seed, game_index), policy_fn, max_actions))
+    return stats
+
+
+def _chunks(games: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, games, chunk_size):
+        yield start, min(chunk_size, games - start)
+
+
+def run_batch(
+    games: int,
+    policy: Union[str, Policy] = "simulate:random_policy",
+    workers: Optional[int] = None,
+    seed: int = 0,
+    chunk_size: int = 500,
+    max_actions: int = 5000,
+    horizon: int = 50,
+    progress: Optional[Callable[[SimStats], None]] = None,
+) -> SimStats:
+    """
+    Joue `games` parties sur `workers` processus (1 = dans ce processus).
+    Au plus 2 paquets par processus sont en vol ; chaque résumé rendu est
+    fusionné aussitôt, puis `progress` est appelé avec le total courant.
+    """
+    total = SimStats(horizon=horizon)
+    chunks = _chunks(games, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for start, count in chunks:
+            total.merge(run_chunk(seed, start, count, policy, max_actions, horizon))
+            if progress:
+                progress(total)
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def submit_next() -> bool:
+            for start, count in chunks:
+                pending.add(pool.submit(run_chunk, seed, start, count, policy, max_actions, horizon))
+                return True
+            return False
+
+        for _ in range(2 * workers):
+            if not submit_next():
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                total.merge(future.result())
+                if progress:
+                    progress(total)
+                submit_next()
+    return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulation Monte Carlo de parties.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--max-actions", type=int, default=5000)
+    parser.add_argument("--policy", default="simulate:random_policy",
+                        help='politique "module:fonction"')
+    args = parser.parse_args(argv)
+
+    def progress(stats: SimStats) -> None:
+        print(f"\r{stats.games}/{args.games} parties", end="", file=sys.stderr, flush=True)
+
+    stats = run_batch(
+        args.games,
+        policy=args.policy,
+        workers=args.workers,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        max_actions=args.max_actions,
+        progress=progress,
+    )
+    print(file=sys.stderr)
+    print(stats.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Hachage de Zobrist des états de partie + table de transposition.
+
+Chaque composante d'un état (salle posée sur une case avec son orientation,
+pièce déjà fouillée, salle encore en pioche, position/direction du joueur,
+valeur de chaque ressource) a une clé 64 bits ; le hash d'un état est le XOR
+des clés de ses composantes. Poser une salle, bouger ou changer une
+ressource ne coûte donc qu'un ou deux XOR (cf. Manor.place_room,
+Player.__setattr__, Inventory.__setattr__).
+"""
+
+import random
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from constants import GRID_ROWS, GRID_COLS, N_CELLS
+from rooms.catalogue import CATALOGUE
+
+MASK64 = (1 << 64) - 1
+
+N_ROOMS = len(CATALOGUE)
+
+DIR_NAMES = ("up", "right", "down", "left")
+
+
+# ------------------ CLÉS ------------------
+
+def splitmix64(x: int) -> int:
+    """Mélangeur 64 bits (SplitMix64) pour les clés calculées à la volée."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+# tables fixes (graine constante : mêmes hash d'une exécution à l'autre)
+_rng = random.Random(0x5EED_2025)
+CELL_KEYS = [_rng.getrandbits(64) for _ in range(N_CELLS * N_ROOMS * 4)]
+LOOTED_KEYS = [_rng.getrandbits(64) for _ in range(N_CELLS)]
+DECK_KEYS = [_rng.getrandbits(64) for _ in range(N_ROOMS)]
+ROW_KEYS = [_rng.getrandbits(64) for _ in range(GRID_ROWS)]
+COL_KEYS = [_rng.getrandbits(64) for _ in range(GRID_COLS)]
+DIR_KEYS = {name: _rng.getrandbits(64) for name in DIR_NAMES}
+del _rng
+
+
+def cell_key(cell: int, room: int, orientation: int) -> int:
+    return CELL_KEYS[(cell * N_ROOMS + room) * 4 + orientation % 4]
+
+
+def resource_key(field: int, value) -> int:
+    """Clé de (ressource, valeur) : les compteurs ne sont pas bornés, pas de table."""
+    return splitmix64((field << 48) ^ (int(value) & 0xFFFF_FFFF_FFFF))
+
+
+def draft_key(slot: int, room: int, orientation: int) -> int:
+    return splitmix64((0xD7 << 56) ^ (slot << 40) ^ (room << 8) ^ orientation)
+
+
+# ------------------ TABLE DE TRANSPOSITION ------------------
+
+class TranspositionTable:
+    """
+    Table bornée hash -> (valeur, profondeur).
+    eviction : "lru" (la moins récemment lue/écrite sort) ou "fifo" (la plus ancienne).
+    Sur une même clé, une entrée plus profonde n'est pas écrasée par une moins profonde.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, eviction: str = "lru"):
+        if eviction not in ("lru", "fifo"):
+            raise ValueError(f"éviction inconnue : {eviction!r}")
+        if capacity <= 0:
+            raise ValueError("capacity doit être > 0")
+        self.capacity = capacity
+        self.eviction = eviction
+        self._entries: "OrderedDict[int, Tuple[Any, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def get(self, key: int, min_depth: int = 0) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < min_depth:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.eviction == "lru":
+            self._entries.move_to_end(key)
+        return entry[0]
+
+    def store(self, key: int, value: Any, depth: int = 0) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > depth:
+                return
+            self._entries[key] = (value, depth)
+            if self.eviction == "lru":
+                self._entries.move_to_end(key)
+            return
+        if len(self._entries) >= self.capacity:
+            self._entries.popitem(last=False)
+        self._entries[key] = (value, depth)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0